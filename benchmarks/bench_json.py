@@ -0,0 +1,99 @@
+"""
+Micro-benchmark of decoding Permit list pages, per page size and JSON decoding path.
+
+Pages of operation approvals from the offline fake Permit API are encoded to bytes, as
+received from the Permit API, then decoded by each path. The CPU time per page, the memory
+retained by a decoded page and the peak memory allocated while decoding it are reported:
+
+    python benchmarks/bench_json.py --sizes 10 100 1000 --repeat 200
+"""
+from typing import Any, Callable, Dict, List, Tuple
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from permit_mcp import codec
+from permit_mcp.fake import FakePermit
+
+
+def _decoders() -> Dict[str, Callable[[bytes], Any]]:
+    decoders = {
+        # The previous path: decode the body to a str, then parse the str.
+        "str + json": lambda content: json.loads(content.decode("utf-8")),
+        "bytes + json": json.loads,
+    }
+    if codec.orjson is not None:
+        decoders["bytes + orjson"] = codec.orjson.loads
+    return decoders
+
+
+def _page(items: List[Dict], size: int) -> bytes:
+    page = [dict(items[index % len(items)], id=f"{index:032x}") for index in range(size)]
+    return json.dumps({"data": page, "total_count": size}).encode()
+
+
+def _cpu_seconds(decode: Callable[[bytes], Any], content: bytes, repeat: int) -> float:
+    gc.disable()
+    try:
+        start = time.process_time()
+        for _ in range(repeat):
+            decode(content)
+        return (time.process_time() - start) / repeat
+    finally:
+        gc.enable()
+
+
+def _memory_bytes(decode: Callable[[bytes], Any], content: bytes) -> Tuple[int, int]:
+    """
+    Returns the memory retained by the decoded page and the peak memory allocated while decoding it.
+    """
+    # Leave one-time allocations (e.g. decoder caches) out of the measurement.
+    decode(content)
+    tracemalloc.start()
+    try:
+        page = decode(content)
+        retained, peak = tracemalloc.get_traced_memory()
+        del page
+        return retained, peak
+    finally:
+        tracemalloc.stop()
+
+
+def main(args: argparse.Namespace) -> List[Dict]:
+    items = FakePermit(operation_approvals=100, seed=args.seed).operation_approvals
+    results = []
+    print(f"JSON backend: {codec.JSON_BACKEND}")
+    print(f"{'items':>6} {'page KiB':>9} {'decoder':<16} {'us/page':>10} {'kept KiB':>10} {'peak KiB':>10}")
+    for size in args.sizes:
+        content = _page(items, size)
+        for name, decode in _decoders().items():
+            retained, peak = _memory_bytes(decode, content)
+            result = {
+                "items": size,
+                "page_bytes": len(content),
+                "decoder": name,
+                "us_per_page": _cpu_seconds(decode, content, args.repeat) * 1e6,
+                "retained_bytes": retained,
+                "peak_bytes": peak,
+            }
+            results.append(result)
+            print(f"{size:>6} {len(content) / 1024:>9.1f} {name:<16} "
+                  f"{result['us_per_page']:>10.1f} {retained / 1024:>10.1f} {peak / 1024:>10.1f}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10, 100, 1000],
+                        help="Items per page (default: 10 100 1000).")
+    parser.add_argument("--repeat", type=int, default=200, help="Decodes per page size and decoder (default: 200).")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the fake data.")
+    parser.add_argument("--json", help="Optional path to write the results as JSON.")
+    args = parser.parse_args()
+
+    results = main(args)
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
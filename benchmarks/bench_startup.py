@@ -0,0 +1,98 @@
+"""
+Cold start benchmark of the Permit MCP server, with an enforced time budget.
+
+Every run starts fresh Python processes and measures the time to import
+`permit_mcp.server`, to construct a PermitServer, and from spawning the stdio server
+to its first `list_tools` response. The exit code is 1 if a median exceeds its budget:
+
+    python benchmarks/bench_startup.py --runs 5 --import-budget 1.0 --list-tools-budget 1.5
+"""
+from typing import Dict, List
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+_MEASURE_IMPORT = """
+import time
+start = time.perf_counter()
+import permit_mcp.server
+imported = time.perf_counter()
+from mcp.server.fastmcp import FastMCP
+permit_mcp.server.PermitServer(FastMCP("permit_mcp_benchmark"))
+constructed = time.perf_counter()
+print(imported - start, constructed - imported)
+"""
+
+
+def _environment() -> Dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [SRC, env.get("PYTHONPATH")]))
+    # The server does not contact Permit before the first tool call.
+    env.setdefault("PERMIT_API_KEY", "permit_key_benchmark")
+    return env
+
+
+def _measure_import() -> List[float]:
+    output = subprocess.run([sys.executable, "-c", _MEASURE_IMPORT], env=_environment(),
+                            check=True, capture_output=True, text=True).stdout
+    return [float(value) for value in output.split()]
+
+
+async def _measure_list_tools() -> float:
+    params = StdioServerParameters(command=sys.executable, args=["-m", "permit_mcp"], env=_environment())
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull:
+        async with stdio_client(params, errlog=devnull) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                await session.list_tools()
+                return time.perf_counter() - start
+
+
+def main(args: argparse.Namespace) -> int:
+    samples: Dict[str, List[float]] = {"import": [], "construct": [], "first_list_tools": []}
+    for _ in range(args.runs):
+        import_time, construct_time = _measure_import()
+        samples["import"].append(import_time)
+        samples["construct"].append(construct_time)
+        samples["first_list_tools"].append(asyncio.run(_measure_list_tools()))
+
+    budgets = {"import": args.import_budget, "first_list_tools": args.list_tools_budget}
+    results = []
+    failed = False
+    print(f"{'phase':<18} {'median ms':>10} {'max ms':>10} {'budget ms':>10}")
+    for phase, values in samples.items():
+        median = statistics.median(values)
+        budget = budgets.get(phase)
+        over = budget is not None and median > budget
+        failed = failed or over
+        results.append({"phase": phase, "median_s": median, "max_s": max(values), "budget_s": budget})
+        budget_text = f"{budget * 1000:>10.0f}" if budget is not None else f"{'-':>10}"
+        print(f"{phase:<18} {median * 1000:>10.1f} {max(values) * 1000:>10.1f} {budget_text}"
+              + ("  OVER BUDGET" if over else ""))
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Number of cold starts (default: 5).")
+    parser.add_argument("--import-budget", type=float, default=1.0,
+                        help="Maximum median seconds to import permit_mcp.server (default: 1.0).")
+    parser.add_argument("--list-tools-budget", type=float, default=1.5,
+                        help="Maximum median seconds from spawn to the first list_tools response (default: 1.5).")
+    parser.add_argument("--json", help="Write the results to this JSON file.")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,151 @@
+"""
+Throughput and latency benchmark of the Permit MCP tools against the offline fake Permit API.
+
+Every tool is called through FastMCP at increasing concurrency levels, and the p50/p95/p99
+latencies and calls per second are reported:
+
+    python benchmarks/bench_tools.py --latency 0.02 --concurrency 1 8 32 --calls 200
+"""
+from typing import Callable, Dict, List
+import argparse
+import asyncio
+import json
+import logging
+import random
+import statistics
+import time
+
+from mcp.server.fastmcp import FastMCP
+
+from permit_mcp import PermitServer
+from permit_mcp.fake import FakePermit
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(percentile / 100 * len(values)) - 1))
+    return values[index]
+
+
+def _tool_arguments(fake: FakePermit) -> Dict[str, Callable[[], Dict]]:
+    """
+    Returns a factory of valid arguments for every tool.
+    """
+    users = list(fake.users)
+    reviewer = users[0]
+
+    def access_request_id():
+        return random.choice(fake.access_requests)["id"]
+
+    def operation_approval_id():
+        return random.choice(fake.operation_approvals)["id"]
+
+    return {
+        "list_resource_instances": lambda: {},
+        "search_resource_instances": lambda: {"query": f"Restaurant {random.randint(1, len(fake.resource_instances))}"},
+        "create_access_request": lambda: {"user_id": random.choice(users), "role": "child-can-view",
+                                          "reason": "benchmark", "resource_instance": "1"},
+        "list_access_requests": lambda: {"user_id": reviewer, "status": "pending"},
+        "approve_access_request": lambda: {"user_id": reviewer, "access_request_id": access_request_id()},
+        "deny_access_request": lambda: {"user_id": reviewer, "access_request_id": access_request_id()},
+        "create_operation_approval": lambda: {"user_id": random.choice(users), "reason": "benchmark",
+                                              "resource_instance": "1"},
+        "list_operation_approvals": lambda: {"user_id": reviewer, "status": "pending"},
+        "approve_operation_approval": lambda: {"user_id": reviewer, "operation_approval_id": operation_approval_id()},
+        "deny_operation_approval": lambda: {"user_id": reviewer, "operation_approval_id": operation_approval_id()},
+        "bulk_approve_access_requests": lambda: {"user_id": reviewer,
+                                                 "access_request_ids": [access_request_id() for _ in range(10)]},
+        "bulk_approve_operation_approvals": lambda: {"user_id": reviewer,
+                                                     "operation_approval_ids": [operation_approval_id() for _ in range(10)]},
+        "wait_for_pending_requests": lambda: {"user_id": reviewer},
+        "get_server_metrics": lambda: {},
+    }
+
+
+async def _run(mcp: FastMCP, tool: str, arguments: Callable[[], Dict], calls: int, concurrency: int) -> Dict:
+    latencies: List[float] = []
+    errors = 0
+    remaining = iter(range(calls))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                await mcp.call_tool(tool, arguments())
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "tool": tool,
+        "concurrency": concurrency,
+        "calls": calls,
+        "errors": errors,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p95_ms": _percentile(latencies, 95) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+        "calls_per_sec": calls / elapsed,
+    }
+
+
+async def main(args: argparse.Namespace) -> List[Dict]:
+    random.seed(args.seed)
+    results = []
+    print(f"{'tool':<32} {'conc':>5} {'calls':>6} {'errors':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'calls/s':>10}")
+
+    tools = args.tools or list(_tool_arguments(FakePermit()))
+    for tool in tools:
+        for concurrency in args.concurrency:
+            fake = FakePermit(
+                resource_instances=args.resource_instances,
+                users=args.users,
+                access_requests=args.items,
+                operation_approvals=args.items,
+                latency=args.latency,
+                jitter=args.jitter,
+                error_rate=args.error_rate,
+                seed=args.seed,
+            )
+            mcp = FastMCP("permit_mcp_benchmark")
+            async with PermitServer(mcp, permit=fake, transport=fake.transport):
+                arguments = _tool_arguments(fake)[tool]
+                # Warm up connections, tokens and caches so only steady-state calls are measured.
+                await _run(mcp, tool, arguments, min(concurrency, args.calls), concurrency)
+                result = await _run(mcp, tool, arguments, args.calls, concurrency)
+
+            results.append(result)
+            print(f"{tool:<32} {concurrency:>5} {result['calls']:>6} {result['errors']:>6} "
+                  f"{result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+                  f"{result['calls_per_sec']:>10.1f}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tools", nargs="*", help="Tools to benchmark (default: all).")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32],
+                        help="Concurrency levels (default: 1 8 32).")
+    parser.add_argument("--calls", type=int, default=200, help="Calls per tool and concurrency level (default: 200).")
+    parser.add_argument("--latency", type=float, default=0.01,
+                        help="Simulated Permit API latency in seconds (default: 0.01).")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Maximum random latency added in seconds.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of injected upstream errors.")
+    parser.add_argument("--items", type=int, default=100,
+                        help="Seeded access requests and operation approvals (default: 100).")
+    parser.add_argument("--users", type=int, default=20, help="Seeded users (default: 20).")
+    parser.add_argument("--resource-instances", type=int, default=20, help="Seeded resource instances (default: 20).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Write the results to this JSON file.")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    results = asyncio.run(main(args))
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
@@ -0,0 +1,133 @@
+"""
+Per-call overhead of the stdio and in-memory MCP transports, against the offline fake Permit API.
+
+The same PermitServer tools are served from a subprocess over stdio and from this process
+through `permit_mcp.memory.memory_transport`. The connection time (including spawning the
+subprocess) and the p50/p95 latencies and calls per second of sequential tool calls are
+reported per transport:
+
+    python benchmarks/bench_transports.py --calls 500
+"""
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from mcp.server.fastmcp import FastMCP
+
+from permit_mcp import PermitServer
+from permit_mcp.fake import FakePermit
+from permit_mcp.memory import memory_transport
+
+TRANSPORTS = ("stdio", "memory")
+
+# A small result served from the in-memory catalog, and a page of full resource instances
+TOOL_CALLS = {
+    "search_resource_instances": {"query": "Restaurant 1", "limit": 5},
+    "list_resource_instances": {"per_page": 100, "fields": ["*"]},
+}
+
+
+def _build_mcp(resource_instances: int) -> FastMCP:
+    fake = FakePermit(resource_instances=resource_instances)
+    mcp = FastMCP("permit_mcp_benchmark")
+    PermitServer(mcp, permit=fake, transport=fake.transport)
+    return mcp
+
+
+@asynccontextmanager
+async def _connect(transport: str, resource_instances: int) -> AsyncIterator[ClientSession]:
+    if transport == "memory":
+        streams = memory_transport(_build_mcp(resource_instances))
+    else:
+        env = dict(os.environ)
+        src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [src, env.get("PYTHONPATH")]))
+        params = StdioServerParameters(
+            command=sys.executable, args=[os.path.abspath(__file__), "--serve", str(resource_instances)], env=env)
+        streams = stdio_client(params, errlog=open(os.devnull, "w"))
+    async with streams as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            yield session
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(percentile / 100 * len(values)) - 1))
+    return values[index]
+
+
+async def _run(transport: str, args: argparse.Namespace) -> List[Dict]:
+    start = time.perf_counter()
+    async with _connect(transport, args.resource_instances) as session:
+        connect_seconds = time.perf_counter() - start
+        results = []
+        for tool, arguments in TOOL_CALLS.items():
+            # Warm up the catalog, the HTTP client and the code paths.
+            for _ in range(10):
+                await session.call_tool(tool, arguments)
+            latencies = []
+            for _ in range(args.calls):
+                call_start = time.perf_counter()
+                result = await session.call_tool(tool, arguments)
+                latencies.append(time.perf_counter() - call_start)
+                if result.isError:
+                    raise RuntimeError(f"{tool} failed: {result.content}")
+            results.append({
+                "transport": transport,
+                "tool": tool,
+                "connect_ms": connect_seconds * 1000,
+                "p50_ms": _percentile(latencies, 50) * 1000,
+                "p95_ms": _percentile(latencies, 95) * 1000,
+                "calls_per_sec": len(latencies) / sum(latencies),
+                "mean_ms": statistics.fmean(latencies) * 1000,
+            })
+        return results
+
+
+async def main(args: argparse.Namespace) -> List[Dict]:
+    results = []
+    print(f"{'transport':<10} {'tool':<28} {'connect ms':>11} {'p50 ms':>9} {'p95 ms':>9} {'calls/s':>10}")
+    for transport in args.transports:
+        for result in await _run(transport, args):
+            results.append(result)
+            print(f"{transport:<10} {result['tool']:<28} {result['connect_ms']:>11.1f} "
+                  f"{result['p50_ms']:>9.3f} {result['p95_ms']:>9.3f} {result['calls_per_sec']:>10.1f}")
+
+    by_key = {(result["transport"], result["tool"]): result for result in results}
+    for tool in TOOL_CALLS:
+        if ("stdio", tool) in by_key and ("memory", tool) in by_key:
+            saved = by_key[("stdio", tool)]["p50_ms"] - by_key[("memory", tool)]["p50_ms"]
+            print(f"{tool}: the in-memory transport saves {saved:.3f} ms per call (p50)")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--transports", nargs="+", choices=TRANSPORTS, default=list(TRANSPORTS),
+                        help="Transports to benchmark (default: stdio memory).")
+    parser.add_argument("--calls", type=int, default=500, help="Calls per tool and transport (default: 500).")
+    parser.add_argument("--resource-instances", type=int, default=100,
+                        help="Seeded resource instances (default: 100).")
+    parser.add_argument("--serve", type=int, metavar="RESOURCE_INSTANCES", help=argparse.SUPPRESS)
+    parser.add_argument("--json", help="Write the results to this JSON file.")
+    args = parser.parse_args()
+
+    if args.serve is not None:
+        # The stdio server subprocess
+        _build_mcp(args.serve).run(transport="stdio")
+        sys.exit(0)
+
+    results = asyncio.run(main(args))
+    if args.json:
+        import json
+
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
@@ -3,6 +3,7 @@ import json
 import httpx
 import websockets
 import sys
+import uuid
 from typing import Dict, List, Optional
 
 API_URL = "http://localhost:8000"  # Change if needed
@@ -31,8 +32,14 @@ async def login(username: str, password: str) -> str | None:
 
 async def chat(token: str):
     history: List[Dict] = []
+    # The server keeps the conversation of the session: only new messages are sent, with
+    # the version of the local copy, and only the entries appended by each turn are received.
+    session_id = uuid.uuid4().hex
+    version = 0
+    last_message: Optional[str] = None
     is_processing = False  # Simple flag to track message processing state
     is_displayed_processing = False
+    is_streaming = False  # Whether an answer is being printed as it streams
 
     print("\n--- Chat session started ---")
     print("Type 'exit' to quit.\n")
@@ -46,7 +53,7 @@ async def chat(token: str):
         ) as websocket:
             # Start a background task for receiving messages
             async def receive_messages():
-                nonlocal is_processing, history, is_displayed_processing
+                nonlocal is_processing, history, is_displayed_processing, is_streaming, version
 
                 while True:
                     try:
@@ -56,11 +63,24 @@ async def chat(token: str):
                         message_type = data.get("type")
                         content = data.get("content")
 
-                        if message_type == "text":
-                            print(f"Assistant: {content}")
+                        if message_type == "text_delta":
+                            if not is_streaming:
+                                print("Assistant: ", end="")
+                                is_streaming = True
+                            print(content, end="", flush=True)
+                        elif message_type == "text":
+                            if is_streaming:
+                                # The answer was already printed as it streamed
+                                print()
+                                is_streaming = False
+                            else:
+                                print(f"Assistant: {content}")
                         elif message_type == "status":
                             print(f"[Status] {content}")
                         elif message_type == "error":
+                            if is_streaming:
+                                print()
+                                is_streaming = False
                             print(f"⚠️ Error: {content}")
                             is_processing = False  # Unlock on error
                             is_displayed_processing = False
@@ -68,6 +88,25 @@ async def chat(token: str):
                             history = content
                             is_processing = False  # Unlock when complete
                             is_displayed_processing = False
+                        elif message_type == "history_delta":
+                            # A delta that does not apply to the local copy is ignored: the next
+                            # message is sent with the older version and the server resyncs it.
+                            if data.get("base") == version:
+                                history.extend(content)
+                                version = data.get("version")
+                            is_processing = False  # Unlock when complete
+                            is_displayed_processing = False
+                        elif message_type == "history_resync":
+                            history = content
+                            version = data.get("version")
+                        elif message_type == "resync_required":
+                            # The server lost the conversation: send the message again with the local copy
+                            await websocket.send(json.dumps({
+                                "message": last_message,
+                                "session_id": session_id,
+                                "version": version,
+                                "history": history
+                            }))
                     except Exception as e:
                         print(f"\n⚠️ Error receiving message: {str(e)}")
                         is_processing = False
@@ -99,9 +138,11 @@ async def chat(token: str):
                 is_processing = True
 
                 # Send the message
+                last_message = user_input
                 payload = {
                     "message": user_input,
-                    "history": history
+                    "session_id": session_id,
+                    "version": version
                 }
 
                 try:
@@ -0,0 +1,171 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class Conversation:
+    """
+    The Gemini contents of a chat session, kept by the server so that clients only send
+    new messages and receive the entries appended by each turn.
+
+    `version` counts the entries appended since the session started. Clients send the
+    version of their copy with each message, and are resynced when it differs.
+    """
+
+    def __init__(self, contents: Optional[List[Dict[str, Any]]] = None, version: Optional[int] = None):
+        self.contents: List[Dict[str, Any]] = list(contents or [])
+        self.version = len(self.contents) if version is None else version
+        self.last_used = time.monotonic()
+        # Turns of a session are processed one at a time, even from several connections.
+        self.lock = asyncio.Lock()
+
+    def commit(self, appended: List[Dict[str, Any]]) -> int:
+        """
+        Records the entries appended to `contents` by a completed turn and returns the new version.
+        """
+        self.version += len(appended)
+        self.last_used = time.monotonic()
+        return self.version
+
+
+class ConversationStore:
+    """
+    Conversations keyed by user and session ID. The least recently used conversations are
+    dropped beyond `max_conversations`, and conversations unused for `max_idle` seconds expire.
+    """
+
+    def __init__(self, max_conversations: int = 1000, max_idle: float = 3600.0):
+        self.max_conversations = max(1, max_conversations)
+        self.max_idle = max_idle
+        self._conversations: "OrderedDict[Tuple[Any, str], Conversation]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._conversations)
+
+    def get(self, user_id: Any, session_id: str) -> Optional[Conversation]:
+        self._expire()
+        conversation = self._conversations.get((user_id, session_id))
+        if conversation is not None:
+            self._conversations.move_to_end((user_id, session_id))
+            conversation.last_used = time.monotonic()
+        return conversation
+
+    def create(
+        self,
+        user_id: Any,
+        session_id: str,
+        contents: Optional[List[Dict[str, Any]]] = None,
+        version: Optional[int] = None,
+    ) -> Conversation:
+        """
+        Starts a conversation, or replaces it with the contents of a client that resyncs.
+        """
+        conversation = Conversation(contents, version)
+        self._conversations[(user_id, session_id)] = conversation
+        self._conversations.move_to_end((user_id, session_id))
+        while len(self._conversations) > self.max_conversations:
+            self._conversations.popitem(last=False)
+        return conversation
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        while self._conversations:
+            key, conversation = next(iter(self._conversations.items()))
+            if now - conversation.last_used <= self.max_idle:
+                break
+            del self._conversations[key]
+
+
+def entry_size(entry: Dict[str, Any]) -> int:
+    """
+    Returns the size of a contents entry as sent to Gemini, in bytes of compact JSON.
+    """
+    return len(json.dumps(entry, separators=(",", ":"), default=str).encode())
+
+
+def _turn_starts(contents: List[Dict[str, Any]]) -> List[int]:
+    # A turn starts with a user message, function responses are sent as user entries too.
+    return [index for index, entry in enumerate(contents)
+            if entry.get("role") == "user" and any("text" in part for part in entry.get("parts", []))]
+
+
+def _summarize_part(part: Dict[str, Any], preview_chars: int) -> Dict[str, Any]:
+    function_response = part.get("function_response")
+    if function_response is None:
+        return part
+    result = function_response.get("response", {}).get("result", {})
+    if result.get("compacted"):
+        return part
+    if "content" in result:
+        text = "\n".join(content.get("text", "") for content in result["content"])
+    else:
+        text = str(result.get("error", ""))
+    name = function_response.get("name")
+    summary = text[:preview_chars]
+    if len(text) > preview_chars:
+        summary += f"... ({len(text) - preview_chars} characters omitted to save space, call {name} again for the full result)"
+    compacted = {"summary": summary, "compacted": True}
+    if "is_error" in result:
+        compacted["is_error"] = result["is_error"]
+    return {"function_response": {"name": name, "response": {"result": compacted}}}
+
+
+def compact(
+    contents: List[Dict[str, Any]],
+    max_bytes: int,
+    keep_turns: int = 2,
+    preview_chars: int = 200,
+) -> Tuple[int, Dict[str, int]]:
+    """
+    Keeps Gemini contents within `max_bytes`, in place. The results of the tool calls of
+    older turns are first replaced with short previews, oldest first, then the oldest turns
+    are dropped. The last `keep_turns` turns are left intact, even beyond the budget.
+
+    Returns the size of the contents in bytes and the number of tool results and turns compacted.
+    """
+    sizes = [entry_size(entry) for entry in contents]
+    total = sum(sizes)
+    stats = {"tool_results": 0, "turns": 0}
+    if total <= max_bytes:
+        return total, stats
+
+    starts = _turn_starts(contents)
+    # Entries from `protected` on belong to the turns left intact.
+    if keep_turns <= 0:
+        protected = len(contents)
+    elif len(starts) >= keep_turns:
+        protected = starts[-keep_turns]
+    else:
+        protected = 0
+
+    for index in range(protected):
+        if total <= max_bytes:
+            break
+        parts = contents[index].get("parts", [])
+        summarized = [_summarize_part(part, preview_chars) for part in parts]
+        replaced = sum(1 for before, after in zip(parts, summarized) if before is not after)
+        if not replaced:
+            continue
+        contents[index] = {**contents[index], "parts": summarized}
+        size = entry_size(contents[index])
+        total += size - sizes[index]
+        sizes[index] = size
+        stats["tool_results"] += replaced
+
+    # Drop whole turns, so that function calls stay followed by their responses.
+    cut = 0
+    for start in starts:
+        if total <= max_bytes or start >= protected:
+            break
+        if start > cut:
+            total -= sum(sizes[cut:start])
+            stats["turns"] += 1
+            cut = start
+    if total > max_bytes and cut < protected:
+        total -= sum(sizes[cut:protected])
+        stats["turns"] += 1
+        cut = protected
+    del contents[:cut]
+    return total, stats
@@ -11,10 +11,11 @@ from permit_client import permit
 
 load_dotenv()
 
-if len(sys.argv) > 1:
+if __name__ == "__main__" and len(sys.argv) > 1:
     DB_NAME = sys.argv[1]
 else:
-    DB_NAME = "test.db"
+    # Imported to be served in-process (see server.py)
+    DB_NAME = os.getenv("DB_NAME", "test.db")
 
 TENANT = os.getenv("TENANT")
 
@@ -23,8 +24,15 @@ cursor = conn.cursor()
 
 # Initialize FastMCP instance and
 # the Permit MCP server  to make it's tools available.
+# The family members rarely change, so requesting users are cached for 10 minutes.
+# Server metrics are for operators, not for the family members chatting with the LLM.
 mcp = FastMCP("family_food_ordering_system")
-permit_server = PermitServer(mcp)
+permit_server = PermitServer(
+    mcp,
+    exclude_tools=["get_server_metrics"],
+    user_cache_size=100,
+    user_cache_ttl=600,
+)
 
 
 @mcp.tool()
@@ -1,9 +1,10 @@
-from mcp import ClientSession, StdioServerParameters
+from mcp import StdioServerParameters
 from mcp.client.stdio import stdio_client
 from datetime import timedelta
-from typing import Dict
+from typing import Dict, Optional
 from utils import *
 from fastapi import Depends, FastAPI, HTTPException, status, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse
 from fastapi.security import OAuth2PasswordRequestForm
 import os
 from contextlib import asynccontextmanager
@@ -12,10 +13,23 @@ from google.genai import types
 import asyncio
 from contextlib import AsyncExitStack
 import json
+from permit_mcp.memory import memory_transport
+from permit_mcp.metrics import MetricsRegistry
+from session_pool import MCPSessionPool, PoolExhausted
+from conversations import ConversationStore, compact, entry_size
 
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 DB_NAME = os.getenv("DB_NAME")
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
+GEMINI_MODEL = "gemini-2.5-flash-preview-04-17"
+# Seconds a model response may take, function calls excluded
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "60"))
+# Bytes of history sent to Gemini before older tool results and turns are compacted
+CHAT_HISTORY_MAX_BYTES = int(os.getenv("CHAT_HISTORY_MAX_BYTES", "200000"))
+# Most recent turns never compacted
+CHAT_HISTORY_KEEP_TURNS = int(os.getenv("CHAT_HISTORY_KEEP_TURNS", "2"))
+# "memory" serves the MCP tools from this process, "stdio" from a food_ordering_mcp.py subprocess
+MCP_TRANSPORT = os.getenv("MCP_TRANSPORT", "memory")
 
 server_params = StdioServerParameters(
     command="python",
@@ -23,13 +37,66 @@ server_params = StdioServerParameters(
     env=None,
 )
 
+if MCP_TRANSPORT == "memory":
+    # Tool calls are passed to the FastMCP instance in memory, without pipes or JSON.
+    from food_ordering_mcp import mcp as food_ordering_mcp, permit_server
+
+    def connect_mcp():
+        return memory_transport(food_ordering_mcp)
+else:
+    permit_server = None
+
+    def connect_mcp():
+        return stdio_client(server_params)
+
 genai_client = genai.Client(api_key=GEMINI_API_KEY)
 
+# Initialized MCP sessions ready to be leased by new chats, so that connecting does not wait
+# for a Python process to start and import the MCP and Permit SDKs.
+session_pool = MCPSessionPool(
+    connect_mcp,
+    min_size=int(os.getenv("MCP_POOL_MIN_SIZE", "2")),
+    max_size=int(os.getenv("MCP_POOL_MAX_SIZE", "20")),
+    max_uses=int(os.getenv("MCP_POOL_MAX_USES", "100")),
+    max_idle=float(os.getenv("MCP_POOL_MAX_IDLE", "600")),
+    acquire_timeout=float(os.getenv("MCP_POOL_ACQUIRE_TIMEOUT", "30")),
+)
+
+# Conversations of the clients that send a session ID, so that they only send new messages
+# and receive the entries appended by each turn instead of the whole history.
+conversations = ConversationStore(
+    max_conversations=int(os.getenv("CHAT_SESSIONS_MAX", "1000")),
+    max_idle=float(os.getenv("CHAT_SESSIONS_MAX_IDLE", "3600")),
+)
+
+SIZE_BUCKETS = (1000, 5000, 10000, 25000, 50000, 100000, 200000, 500000, 1000000)
+TOKEN_BUCKETS = (250, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000, 250000)
+chat_metrics = MetricsRegistry()
+gemini_request_bytes = chat_metrics.histogram(
+    "chat_gemini_request_bytes",
+    "Size of the contents sent with each Gemini request.",
+    buckets=SIZE_BUCKETS)
+gemini_tokens = chat_metrics.histogram(
+    "chat_gemini_tokens",
+    "Tokens of each Gemini request, by kind (prompt or response), as reported by Gemini.",
+    ("kind",),
+    buckets=TOKEN_BUCKETS)
+history_compactions = chat_metrics.counter(
+    "chat_history_compacted_total",
+    "Tool results summarized and turns dropped to keep histories within CHAT_HISTORY_MAX_BYTES.",
+    ("kind",))
+# History bytes held by each open chat connection
+connection_history_bytes: Dict[int, int] = {}
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
+    await session_pool.start()
     yield
+    await session_pool.close()
+    if permit_server is not None:
+        await permit_server.aclose()
 
 # Create the app with lifespan
 app = FastAPI(lifespan=lifespan)
@@ -72,6 +139,17 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
     return {"access_token": access_token, "token_type": "bearer"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    history_bytes = connection_history_bytes.values()
+    return chat_metrics.render({
+        "chat_connections": ("Open chat connections.", len(history_bytes)),
+        "chat_history_bytes": ("History bytes held by the open chat connections.", sum(history_bytes)),
+        "chat_history_bytes_max": ("History bytes held by the largest chat connection.", max(history_bytes, default=0)),
+        "chat_sessions": ("Chat sessions kept by the server.", len(conversations)),
+    })
+
+
 @app.websocket("/ws/chat")
 async def websocket_chat(websocket: WebSocket):
     current_user = await get_current_websocket_user(websocket)
@@ -86,21 +164,19 @@ async def websocket_chat(websocket: WebSocket):
         return
 
     client_id = current_user.get('id')
+    connection_id = id(websocket)
 
     await manager.connect(websocket, client_id)
+    exit_stack = AsyncExitStack()
+    receiver: Optional[asyncio.Task] = None
+    turn: Optional[asyncio.Task] = None
     try:
-        exit_stack = AsyncExitStack()
-        stdio_transport = await exit_stack.enter_async_context(stdio_client(server_params))
-        stdio, write = stdio_transport
-        session = await exit_stack.enter_async_context(ClientSession(stdio, write))
-
-        await session.initialize()
-
-        # Get MCP client and tools
-        tools_result = await session.list_tools()
+        # Lease an initialized MCP session and its tools for this conversation
+        pooled_session = await exit_stack.enter_async_context(session_pool.lease())
+        session = pooled_session.session
 
         filtered_mcp_tools = filter_tools_by_role(
-            tools_result.tools,
+            pooled_session.tools,
             current_user['role']
         )
 
@@ -110,69 +186,189 @@ async def websocket_chat(websocket: WebSocket):
         ]
 
         contents = []
-
-        while True:
-            # Wait for messages from the client
-            data = await websocket.receive_text()
-            data = json.loads(data)
-
+        messages: asyncio.Queue = asyncio.Queue()
+
+        async def receive_messages():
+            # Keep reading while a turn is running, so that a disconnect is noticed
+            # right away and the turn's model and tool calls are cancelled.
+            try:
+                while True:
+                    messages.put_nowait(await websocket.receive_text())
+            finally:
+                messages.put_nowait(None)
+                if turn is not None:
+                    turn.cancel()
+
+        system_instruction = f"""
+        - **current_user_role**: {current_user.get('role')}
+        - **user_id**: "{current_user.get('id')}". This is the ID to be used for tool calls.
+        - **role**: "child-can-view". This is the role to requet for if a users wants to create an access request.
+        - **resource_instance** is required. Always specify this parameter as the ReBAC authorization model is been used in this system.
+        - **reason**: Ask the user to provide a value for the reason parameter directly, without generating one yourself.
+        NOTE: The only assignable role is **child-can-view**. Therefore, please do not prompt the user to specify a role—this role should be applied automatically when needed.
+
+        ALWAYS begin by listing the available resource instances. These contain the list of restaurants users can order from, along with the corresponding IDs and keys needed for tool calls—since the `resource_instance` parameter is required for all tools.
+
+        Starting with this list allows you to:
+        - Show users the restaurants they can choose from before ordering a dish.
+        - Ensure you have access to the correct IDs and keys for any subsequent tool calls.
+
+        NOTE: ALWAYS begin by listing the available resource instances using the list_resource_instances tool.
+        """
+
+        async def generate(contents):
+            """
+            Streams a response from Gemini without blocking the event loop, sending its text
+            to the client as `text_delta` messages as soon as it arrives.
+            Returns the text and the function calls of the response.
+            """
+            text = []
+            function_calls = []
+            usage = None
+            stream = await genai_client.aio.models.generate_content_stream(
+                model=GEMINI_MODEL,
+                contents=contents,
+                config=types.GenerateContentConfig(
+                    tools=mcp_tools,
+                    system_instruction=system_instruction,
+                )
+            )
+            async for chunk in stream:
+                if chunk.text:
+                    text.append(chunk.text)
+                    await manager.send_message(json.dumps({
+                        "type": "text_delta",
+                        "content": chunk.text
+                    }), client_id)
+                if chunk.function_calls:
+                    function_calls.extend(chunk.function_calls)
+                # The usage is reported with the last chunks
+                usage = getattr(chunk, "usage_metadata", None) or usage
+            if usage is not None:
+                if usage.prompt_token_count is not None:
+                    gemini_tokens.observe(usage.prompt_token_count, kind="prompt")
+                if usage.candidates_token_count is not None:
+                    gemini_tokens.observe(usage.candidates_token_count, kind="response")
+            return "".join(text), function_calls
+
+        async def process_message(data):
+            nonlocal contents
             message = data.get('message')
             history = data.get('history')
-
-            # Use provided history or continue with existing conversation
-            if history:
-                contents = history
-
+            session_id = data.get('session_id')
+
+            if session_id is None:
+                # Use provided history or continue with existing conversation
+                if history:
+                    contents = history
+                if await run_turn(contents, message) is None:
+                    return
+                # Send the full updated history to the client
+                await manager.send_message(json.dumps({
+                    "type": "history_update",
+                    "content": contents
+                }), client_id)
+                return
+
+            version = data.get('version', 0)
+            conversation = conversations.get(client_id, session_id)
+            if history is not None:
+                # The client resends its copy when the server does not have the conversation
+                conversation = conversations.create(client_id, session_id, history, version)
+            elif conversation is None and version > 0 or conversation is not None and version > conversation.version:
+                # The conversation expired or the server restarted: ask for the client's copy
+                await manager.send_message(json.dumps({
+                    "type": "resync_required",
+                    "session_id": session_id,
+                    "version": conversation.version if conversation is not None else 0
+                }), client_id)
+                return
+            elif conversation is None:
+                conversation = conversations.create(client_id, session_id)
+
+            async with conversation.lock:
+                if version != conversation.version:
+                    # The client missed entries, e.g. a turn of another connection of the session
+                    await manager.send_message(json.dumps({
+                        "type": "history_resync",
+                        "session_id": session_id,
+                        "version": conversation.version,
+                        "content": conversation.contents
+                    }), client_id)
+                base = conversation.version
+                appended = await run_turn(conversation.contents, message)
+                if appended is None:
+                    return
+                # Send only the entries appended by this turn
+                await manager.send_message(json.dumps({
+                    "type": "history_delta",
+                    "session_id": session_id,
+                    "base": base,
+                    "version": conversation.commit(appended),
+                    "content": appended
+                }), client_id)
+
+        def compact_history(contents):
+            size, compacted = compact(contents, CHAT_HISTORY_MAX_BYTES, CHAT_HISTORY_KEEP_TURNS)
+            for kind, count in compacted.items():
+                if count:
+                    history_compactions.inc(count, kind=kind)
+            return size
+
+        async def run_turn(contents, message):
+            """
+            Answers a message. Returns the entries of the turn, which are appended to `contents`
+            once the turn completes, or None if it did not complete.
+            """
             # Add the new user message
-            contents.append({
+            turn_contents = [{
                 "role": "user",
                 "parts": [{"text": message}]
-            })
+            }]
+            if not await answer(contents, turn_contents):
+                return None
+            contents.extend(turn_contents)
+            connection_history_bytes[connection_id] = compact_history(contents)
+            return turn_contents
+
+        async def answer(history, contents):
+            """
+            Answers the message of a turn, appending the model responses and the function
+            call results to the turn's `contents`. Returns whether the turn completed.
+            """
 
             # Process messages and handle function calls
             has_more_function_calls = True
 
             while has_more_function_calls:
                 # Call Gemini API
-                response = genai_client.models.generate_content(
-                    model="gemini-2.5-flash-preview-04-17",
-                    contents=contents,
-                    config=types.GenerateContentConfig(
-                        tools=mcp_tools,
-                        system_instruction=f"""
-                        - **current_user_role**: {current_user.get('role')}
-                        - **user_id**: "{current_user.get('id')}". This is the ID to be used for tool calls.
-                        - **role**: "child-can-view". This is the role to requet for if a users wants to create an access request.
-                        - **resource_instance** is required. Always specify this parameter as the ReBAC authorization model is been used in this system.
-                        - **reason**: Ask the user to provide a value for the reason parameter directly, without generating one yourself.
-                        NOTE: The only assignable role is **child-can-view**. Therefore, please do not prompt the user to specify a role—this role should be applied automatically when needed.
-                        
-                        ALWAYS begin by listing the available resource instances. These contain the list of restaurants users can order from, along with the corresponding IDs and keys needed for tool calls—since the `resource_instance` parameter is required for all tools.
-
-                        Starting with this list allows you to:
-                        - Show users the restaurants they can choose from before ordering a dish.
-                        - Ensure you have access to the correct IDs and keys for any subsequent tool calls.
-                        
-                        NOTE: ALWAYS begin by listing the available resource instances using the list_resource_instances tool. 
-                        """
-                    )
-                )
+                # Keep the history within its budget, the current turn is sent as is
+                request_bytes = compact_history(history) + sum(entry_size(entry) for entry in contents)
+                gemini_request_bytes.observe(request_bytes)
+                try:
+                    response_text, function_calls = await asyncio.wait_for(
+                        generate(history + contents), GEMINI_TIMEOUT)
+                except asyncio.TimeoutError:
+                    await manager.send_message(json.dumps({
+                        "type": "error",
+                        "content": f"The assistant did not answer within {GEMINI_TIMEOUT:g} seconds. Please try again."
+                    }), client_id)
+                    return False
 
-                # Store and send the model's text response
-                if hasattr(response, 'text') and response.text:
+                # Store the model's text response
+                if response_text:
                     # Add the model's response to the conversation history
                     contents.append({
                         "role": "model",
-                        "parts": [{"text": response.text}]
+                        "parts": [{"text": response_text}]
                     })
 
-                    # Send the text response immediately to the client
+                    # Send the complete text, for clients that do not render `text_delta` messages
                     await manager.send_message(json.dumps({
                         "type": "text",
-                        "content": response.text
+                        "content": response_text
                     }), client_id)
 
-                function_calls = getattr(response, 'function_calls', None)
                 if function_calls and len(function_calls) > 0:
                     # Inform client that function calls are being processed
                     await manager.send_message(json.dumps({
@@ -234,15 +430,37 @@ async def websocket_chat(websocket: WebSocket):
                     "role": "user",
                     "parts": [{"function_response": result} for result in results]
                 })
+            return True
+
+        receiver = asyncio.create_task(receive_messages())
 
-            # Send the full updated history to the client
-            await manager.send_message(json.dumps({
-                "type": "history_update",
-                "content": contents
-            }), client_id)
+        while True:
+            # Wait for messages from the client
+            data = await messages.get()
+            if data is None:
+                # The client disconnected
+                break
+
+            turn = asyncio.create_task(process_message(json.loads(data)))
+            try:
+                await turn
+            except asyncio.CancelledError:
+                if not turn.cancelled():
+                    raise
+                # The client disconnected during the turn
+                break
+            turn = None
 
     except WebSocketDisconnect:
         manager.disconnect(client_id)
+    except PoolExhausted as err:
+        print(err)
+        # Every MCP session is leased by another chat
+        await manager.send_message(json.dumps({
+            "type": "error",
+            "content": "The assistant is busy with other chats. Please try again in a few minutes."
+        }), client_id)
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
     except Exception as err:
         print(err)
         # Send error message to client
@@ -252,4 +470,10 @@ async def websocket_chat(websocket: WebSocket):
         }), client_id)
     finally:
         manager.disconnect(client_id)
+        connection_history_bytes.pop(connection_id, None)
+        # Stop the turn before its MCP session is returned to the pool
+        tasks = [task for task in (turn, receiver) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
         await exit_stack.aclose()
@@ -0,0 +1,245 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncContextManager, AsyncIterator, Callable, List, Optional, Tuple
+
+from mcp import ClientSession
+
+# Returns the transport of a new MCP session, e.g. `lambda: stdio_client(server_params)`
+Connect = Callable[[], AsyncContextManager[Tuple[Any, Any]]]
+
+
+class PoolExhausted(Exception):
+    """
+    Raised when no session became available within the pool's `acquire_timeout`.
+    """
+
+
+class PooledSession:
+    """
+    An initialized MCP client session with its listed tools.
+
+    The transport and the session are opened and closed by a dedicated task, as the MCP
+    transports must be exited by the task that entered them.
+    """
+
+    def __init__(self):
+        self.session: Optional[ClientSession] = None
+        self.tools: List[Any] = []
+        self.uses = 0
+        self.last_used = time.monotonic()
+        self._started: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._closing = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def closed(self) -> bool:
+        return self._task is None or self._task.done()
+
+    async def open(self, connect: Connect) -> None:
+        self._task = asyncio.create_task(self._run(connect))
+        await asyncio.shield(self._started)
+
+    async def _run(self, connect: Connect) -> None:
+        try:
+            async with connect() as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    self.tools = (await session.list_tools()).tools
+                    self.session = session
+                    self._started.set_result(None)
+                    await self._closing.wait()
+        except asyncio.CancelledError:
+            if not self._started.done():
+                self._started.cancel()
+            raise
+        except Exception as error:
+            if not self._started.done():
+                self._started.set_exception(error)
+
+    async def close(self, timeout: float = 5.0) -> None:
+        self._closing.set()
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError, Exception):
+                pass
+
+
+class MCPSessionPool:
+    """
+    A pool of initialized MCP sessions, leased for the length of a conversation.
+
+    `min_size` sessions are kept ready, and up to `max_size` are opened under load. When all
+    of them are leased, `acquire` waits up to `acquire_timeout` seconds for one to be released.
+    A session is replaced after `max_uses` leases or `max_idle` seconds unused, and pinged
+    before a lease when it has been idle for more than `health_check_after` seconds.
+    """
+
+    def __init__(
+        self,
+        connect: Connect,
+        min_size: int = 2,
+        max_size: int = 20,
+        max_uses: int = 100,
+        max_idle: float = 600.0,
+        health_check_after: float = 30.0,
+        health_check_timeout: float = 5.0,
+        acquire_timeout: Optional[float] = 30.0,
+    ):
+        self.connect = connect
+        self.min_size = max(0, min_size)
+        self.max_size = max(1, max_size, self.min_size)
+        self.max_uses = max(1, max_uses)
+        self.max_idle = max_idle
+        self.health_check_after = health_check_after
+        self.health_check_timeout = health_check_timeout
+        self.acquire_timeout = acquire_timeout
+        self._idle: List[PooledSession] = []
+        self._size = 0  # Sessions open or opening
+        self._available = asyncio.Condition()
+        self._tasks: set = set()
+        self._reaper: Optional[asyncio.Task] = None
+        self._closed = False
+
+    async def start(self) -> None:
+        """
+        Opens the `min_size` sessions and starts recycling idle ones.
+        """
+        self._replenish()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._reaper = asyncio.create_task(self._recycle_idle())
+
+    async def _open(self) -> PooledSession:
+        pooled = PooledSession()
+        try:
+            await pooled.open(self.connect)
+        except BaseException:
+            await self._discard(pooled)
+            raise
+        return pooled
+
+    async def _fill(self) -> None:
+        # The slot of the session was reserved by _replenish.
+        try:
+            pooled = await self._open()
+        except Exception as error:
+            print(f"Failed to open an MCP session: {error}")
+            return
+        if self._closed:
+            await self._discard(pooled)
+            return
+        async with self._available:
+            self._idle.append(pooled)
+            self._available.notify()
+
+    async def _discard(self, pooled: PooledSession) -> None:
+        self._size -= 1
+        await pooled.close()
+        async with self._available:
+            self._available.notify()
+
+    def _replenish(self) -> None:
+        while self._size < self.min_size:
+            self._size += 1
+            task = asyncio.create_task(self._fill())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _is_healthy(self, pooled: PooledSession) -> bool:
+        if pooled.closed:
+            return False
+        if time.monotonic() - pooled.last_used < self.health_check_after:
+            return True
+        try:
+            await asyncio.wait_for(pooled.session.send_ping(), self.health_check_timeout)
+            return True
+        except Exception:
+            return False
+
+    async def acquire(self) -> PooledSession:
+        """
+        Returns an idle healthy session, opening one if the pool is not full, else waits for one.
+
+        Raises:
+            PoolExhausted: If no session became available within `acquire_timeout` seconds.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = None if self.acquire_timeout is None else loop.time() + self.acquire_timeout
+        while True:
+            async with self._available:
+                while not self._idle and self._size >= self.max_size:
+                    timeout = None if deadline is None else max(0.0, deadline - loop.time())
+                    try:
+                        await asyncio.wait_for(self._available.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        raise PoolExhausted(
+                            f"No MCP session became available within {self.acquire_timeout:g}s.") from None
+                if self._idle:
+                    # The most recently used session is the most likely to be healthy.
+                    pooled = self._idle.pop()
+                else:
+                    pooled = None
+                    self._size += 1
+
+            if pooled is None:
+                return await self._open()
+            if await self._is_healthy(pooled):
+                return pooled
+            await self._discard(pooled)
+            self._replenish()
+
+    async def release(self, pooled: PooledSession, broken: bool = False) -> None:
+        """
+        Returns a session to the pool, or replaces it if it is broken or was used `max_uses` times.
+        """
+        pooled.uses += 1
+        pooled.last_used = time.monotonic()
+        if broken or self._closed or pooled.closed or pooled.uses >= self.max_uses:
+            await self._discard(pooled)
+            self._replenish()
+            return
+        async with self._available:
+            self._idle.append(pooled)
+            self._available.notify()
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[PooledSession]:
+        """
+        Leases a session for a conversation. It is replaced instead of reused when the
+        conversation ends with an exception.
+        """
+        pooled = await self.acquire()
+        broken = True
+        try:
+            yield pooled
+            broken = False
+        finally:
+            await self.release(pooled, broken)
+
+    async def _recycle_idle(self) -> None:
+        while True:
+            await asyncio.sleep(max(1.0, min(60.0, self.max_idle / 4)))
+            now = time.monotonic()
+            async with self._available:
+                expired = [pooled for pooled in self._idle if now - pooled.last_used > self.max_idle]
+                self._idle = [pooled for pooled in self._idle if pooled not in expired]
+            for pooled in expired:
+                await self._discard(pooled)
+            self._replenish()
+
+    async def close(self) -> None:
+        """
+        Closes the idle sessions. Leased sessions are closed when they are released.
+        """
+        self._closed = True
+        self.min_size = 0
+        if self._reaper is not None:
+            self._reaper.cancel()
+            await asyncio.gather(self._reaper, return_exceptions=True)
+        # Sessions being opened are closed as soon as they are ready.
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        async with self._available:
+            idle, self._idle = self._idle, []
+        for pooled in idle:
+            await self._discard(pooled)
@@ -7,6 +7,8 @@ from jose import JWTError, jwt
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, Any
 from fastapi import WebSocket
+import asyncio
+import random
 
 load_dotenv()
 
@@ -197,6 +199,7 @@ def filter_tools_by_role(tools, role):
     """
     CHILD_ALLOWED_TOOLS = [
         "list_resource_instances",
+        "search_resource_instances",
         "create_operation_approval",
         "create_access_request",
         "list_dishes",
@@ -355,8 +358,13 @@ async def get_current_websocket_user(websocket: WebSocket) -> Optional[Dict]:
 async def retry_tool_call(session: Any, name: str, args: Dict[str, Any]) -> Any:
     """
     Retries calling an MCP tool with exponential backoff.
+
+    Errors reported by the tool are returned as is: the Permit tools already retry
+    transient Permit API failures, so calling them again would only add load.
+    Only failures to reach the MCP server are retried.
     """
     MAX_RETRIES = 2  # Define the maximum number of retries
+    BACKOFF_SECONDS = 0.5
 
     last_error: Optional[Exception] = None
 
@@ -365,11 +373,11 @@ async def retry_tool_call(session: Any, name: str, args: Dict[str, Any]) -> Any:
             result = await session.call_tool(name, args)
             if result.isError:
                 print(result)
-                last_error = result
-            else:
-                return result
+            return result
         except Exception as error:
             print(error, "This is the MCP tools call error")
             last_error = error
+            if attempt < MAX_RETRIES:
+                await asyncio.sleep(random.uniform(0, BACKOFF_SECONDS * 2 ** (attempt - 1)))
 
     return last_error
@@ -0,0 +1,16 @@
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .server import PermitServer
+
+__all__ = ["PermitServer"]
+
+
+def __getattr__(name: str):
+    # Import the server lazily so that `import permit_mcp` and its lightweight
+    # submodules do not pay for the MCP and HTTP imports.
+    if name == "PermitServer":
+        from .server import PermitServer
+
+        return PermitServer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
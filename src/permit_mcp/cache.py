@@ -0,0 +1,88 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+import time
+
+# Returned by TTLCache.get when a key is not cached (or has expired)
+MISSING = object()
+
+
+class TTLCache:
+    """
+    A size-bounded LRU cache whose entries expire after a time-to-live.
+
+    Besides regular values, the cache can hold negative entries for keys that are known
+    not to exist. They are returned as `None` and usually expire sooner than regular entries.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        negative_ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            maxsize: Maximum number of entries. The least recently used entry is evicted first.
+            ttl: Seconds a value stays valid.
+            negative_ttl: Seconds a negative entry stays valid (default: same as `ttl`).
+            clock: Monotonic clock used to expire entries.
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Returns the cached value, `None` for a negative entry, or `MISSING`.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > self._clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+        self.misses += 1
+        return MISSING
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Caches a value. Setting `None` stores a negative entry.
+        """
+        if ttl is None:
+            ttl = self.negative_ttl if value is None else self.ttl
+        self._entries[key] = (self._clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """
+        Removes a single entry, or every entry when no key is given.
+        """
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def stats(self) -> Dict:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,150 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+import asyncio
+import logging
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def _normalize(value: Any) -> str:
+    return str(value).strip().casefold()
+
+
+def _tokenize(value: str) -> List[str]:
+    return _TOKEN_PATTERN.findall(value)
+
+
+class ResourceCatalog:
+    """
+    An in-memory copy of the resource instances, indexed by ID, key and attribute values.
+
+    The catalog is loaded on first use and then refreshed in the background every
+    `refresh_interval` seconds. If a refresh fails, the previous snapshot keeps being served.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], Awaitable[List[Dict]]],
+        refresh_interval: float = 300.0,
+    ):
+        """
+        Args:
+            loader: Coroutine function returning every resource instance.
+            refresh_interval: Seconds between background refreshes.
+        """
+        self._loader = loader
+        self.refresh_interval = refresh_interval
+        self.loaded_at: Optional[float] = None
+        self._instances: List[Dict] = []
+        self._exact: Dict[str, Set[int]] = {}
+        self._tokens: Dict[str, Set[int]] = {}
+        self._attribute_exact: Dict[Tuple[str, str], Set[int]] = {}
+        self._attribute_tokens: Dict[Tuple[str, str], Set[int]] = {}
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def replace(self, instances: List[Dict]) -> None:
+        """
+        Replaces the catalog content and rebuilds its indexes.
+        """
+        exact: Dict[str, Set[int]] = {}
+        tokens: Dict[str, Set[int]] = {}
+        attribute_exact: Dict[Tuple[str, str], Set[int]] = {}
+        attribute_tokens: Dict[Tuple[str, str], Set[int]] = {}
+
+        for position, instance in enumerate(instances):
+            for field in ("id", "key"):
+                if instance.get(field) is not None:
+                    value = _normalize(instance[field])
+                    exact.setdefault(value, set()).add(position)
+                    for token in _tokenize(value):
+                        tokens.setdefault(token, set()).add(position)
+
+            for name, raw_value in (instance.get("attributes") or {}).items():
+                if raw_value is None or isinstance(raw_value, (dict, list)):
+                    continue
+                value = _normalize(raw_value)
+                exact.setdefault(value, set()).add(position)
+                attribute_exact.setdefault((name, value), set()).add(position)
+                for token in _tokenize(value):
+                    tokens.setdefault(token, set()).add(position)
+                    attribute_tokens.setdefault(
+                        (name, token), set()).add(position)
+
+        self._instances = list(instances)
+        self._exact = exact
+        self._tokens = tokens
+        self._attribute_exact = attribute_exact
+        self._attribute_tokens = attribute_tokens
+        self.loaded_at = time.time()
+
+    def search(self, query: str, attribute: Optional[str] = None, limit: int = 20) -> List[Dict]:
+        """
+        Returns the instances matching the query, exact matches first.
+
+        Without an attribute, the query is matched against the ID, the key and every
+        attribute value. A value matches if it equals the query or contains all its words,
+        ignoring case.
+        """
+        normalized = _normalize(query)
+        query_tokens = _tokenize(normalized)
+        if attribute is None:
+            exact = self._exact.get(normalized, set())
+            postings = [self._tokens.get(token, set())
+                        for token in query_tokens]
+        else:
+            exact = self._attribute_exact.get((attribute, normalized), set())
+            postings = [self._attribute_tokens.get((attribute, token), set())
+                        for token in query_tokens]
+
+        partial = set.intersection(*postings) - exact if postings else set()
+        positions = sorted(exact) + sorted(partial)
+        return [self._instances[position] for position in positions[:max(0, limit)]]
+
+    async def refresh(self) -> None:
+        """
+        Reloads the catalog. Concurrent calls share a single load.
+        """
+        loaded_at = self.loaded_at
+        async with self._lock:
+            if self.loaded_at != loaded_at:
+                # Another caller refreshed the catalog while this one was waiting.
+                return
+            self.replace(await self._loader())
+            logger.debug(
+                f"Resource catalog refreshed with {len(self._instances)} instances")
+
+    async def ensure_loaded(self) -> None:
+        """
+        Loads the catalog if needed and starts the background refresh.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh_periodically())
+        if self.loaded_at is None:
+            await self.refresh()
+
+    async def _refresh_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as error:
+                logger.warning(f"Failed to refresh the resource catalog: {error}")
+
+    async def stop(self) -> None:
+        """
+        Stops the background refresh.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def __len__(self) -> int:
+        return len(self._instances)
@@ -0,0 +1,21 @@
+from typing import Any, Union
+import json
+
+try:
+    # Optional faster JSON backend (`permit-mcp[orjson]`)
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """
+    Decodes a JSON document from the bytes of a response body. orjson, when installed,
+    parses the bytes directly; the standard library decodes them to a str internally, so
+    it costs the same as decoding `response.text`.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -0,0 +1,109 @@
+from typing import Dict, Optional, Sequence
+import os
+
+DEFAULT_PDP_URL = "https://cloudpdp.api.permit.io"
+DEFAULT_API_URL = "https://api.permit.io"
+
+_dotenv_loaded = False
+
+
+def _load_dotenv() -> None:
+    """
+    Loads the `.env` file once. Deferred until a configuration is read from the environment
+    so that importing the package has no side effects.
+    """
+    global _dotenv_loaded
+    if not _dotenv_loaded:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        _dotenv_loaded = True
+
+
+class PermitConfig:
+    """
+    The Permit project, environment, tenant and resource that PermitServer manages access
+    requests for, with the Permit API base URLs and headers precomputed.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str],
+        project_id: Optional[str],
+        env_id: Optional[str],
+        tenant: str = "default",
+        resource_key: Optional[str] = None,
+        access_elements_config_id: Optional[str] = None,
+        operation_elements_config_id: Optional[str] = None,
+        pdp_url: str = DEFAULT_PDP_URL,
+        api_url: str = DEFAULT_API_URL,
+    ):
+        """
+        Args:
+            api_key: The Permit API key.
+            project_id: The ID of the Permit project.
+            env_id: The ID of the Permit environment.
+            tenant: The tenant the requests belong to (default: "default").
+            resource_key: The key of the resource to manage access for.
+            access_elements_config_id: The ID of the user management element.
+            operation_elements_config_id: The ID of the approval management element.
+            pdp_url: The URL of the Permit PDP.
+            api_url: The URL of the Permit API.
+        """
+        self.api_key = api_key
+        self.project_id = project_id
+        self.env_id = env_id
+        self.tenant = tenant
+        self.resource_key = resource_key
+        self.access_elements_config_id = access_elements_config_id
+        self.operation_elements_config_id = operation_elements_config_id
+        self.pdp_url = pdp_url
+        self.api_url = api_url.rstrip("/")
+
+        facts_url = f"{self.api_url}/v2/facts/{project_id}/{env_id}"
+        self.resource_instances_url = f"{facts_url}/resource_instances"
+        self._access_requests_url = f"{facts_url}/access_requests/{access_elements_config_id}"
+        self.operation_approvals_url = f"{self.api_url}/v2/elements/{project_id}/{env_id}/config/{operation_elements_config_id}/operation_approval"
+        self.headers = {
+            "authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        }
+
+    def access_requests_url(self, user_id: str) -> str:
+        return f"{self._access_requests_url}/user/{user_id}/tenant/{self.tenant}"
+
+    @classmethod
+    def from_env(cls, prefix: str = "") -> "PermitConfig":
+        """
+        Reads a configuration from the environment variables (and the `.env` file).
+
+        With a prefix (e.g. "ACME_"), `ACME_TENANT` is read instead of `TENANT`, and so on.
+        Variables missing with the prefix fall back to the unprefixed ones, so that
+        configurations can share e.g. the API key and project.
+        """
+        _load_dotenv()
+
+        def getenv(name: str, default: Optional[str] = None) -> Optional[str]:
+            value = os.getenv(prefix + name) if prefix else None
+            return value if value is not None else os.getenv(name, default)
+
+        return cls(
+            api_key=getenv("PERMIT_API_KEY"),
+            project_id=getenv("PROJECT_ID"),
+            env_id=getenv("ENV_ID"),
+            tenant=getenv("TENANT", "default"),
+            resource_key=getenv("RESOURCE_KEY"),
+            access_elements_config_id=getenv("ACCESS_ELEMENTS_CONFIG_ID"),
+            operation_elements_config_id=getenv("OPERATION_ELEMENTS_CONFIG_ID"),
+            pdp_url=getenv("PERMIT_PDP_URL", DEFAULT_PDP_URL),
+            api_url=getenv("PERMIT_API_URL", DEFAULT_API_URL),
+        )
+
+
+def configs_from_env(names: Sequence[str]) -> Dict[str, "PermitConfig"]:
+    """
+    Reads a named configuration per name, each from the environment variables prefixed
+    with the upper-cased name and an underscore (e.g. `ACME_TENANT` for "acme", with
+    dashes replaced by underscores).
+    """
+    return {name: PermitConfig.from_env(prefix=f"{name.upper().replace('-', '_')}_") for name in names}
@@ -0,0 +1,260 @@
+from collections import Counter
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+import asyncio
+import base64
+import datetime
+import json
+import random
+import re
+import time
+import uuid
+
+import httpx
+from permit.api.elements import UserLoginAsResponse
+from permit.api.models import UserRead
+from permit.exceptions import PermitApiError
+
+_FACTS_PATH = r"/v2/facts/[^/]+/[^/]+"
+_ELEMENTS_PATH = r"/v2/elements/[^/]+/[^/]+/config/[^/]+"
+
+_ROUTES = [
+    ("GET", re.compile(_FACTS_PATH + r"/resource_instances"),
+     "list_resource_instances"),
+    ("GET", re.compile(_FACTS_PATH + r"/access_requests/[^/]+/user/(?P<user_id>[^/]+)/tenant/[^/]+"),
+     "list_access_requests"),
+    ("POST", re.compile(_FACTS_PATH + r"/access_requests/[^/]+/user/(?P<user_id>[^/]+)/tenant/[^/]+"),
+     "create_access_request"),
+    ("PUT", re.compile(_FACTS_PATH + r"/access_requests/[^/]+/user/(?P<user_id>[^/]+)/tenant/[^/]+/(?P<item_id>[^/]+)/(?P<action>approve|deny)"),
+     "review_access_request"),
+    ("GET", re.compile(_ELEMENTS_PATH + r"/operation_approval"),
+     "list_operation_approvals"),
+    ("POST", re.compile(_ELEMENTS_PATH + r"/operation_approval"),
+     "create_operation_approval"),
+    ("PUT", re.compile(_ELEMENTS_PATH + r"/operation_approval/(?P<item_id>[^/]+)/(?P<action>approve|deny)"),
+     "review_operation_approval"),
+]
+
+_STATUSES = ("pending", "approved", "denied", "canceled")
+
+
+def _make_token(user_id: str, ttl: float) -> str:
+    def encode(data: Dict) -> str:
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+    claims = {"sub": user_id, "exp": time.time() + ttl, "jti": uuid.uuid4().hex}
+    return f"{encode({'alg': 'none'})}.{encode(claims)}.fake"
+
+
+class FakeApiError(PermitApiError):
+    """
+    A PermitApiError raised by the fake SDK calls.
+    """
+
+    def __init__(self, status: int, url: str):
+        super().__init__(SimpleNamespace(status=status, url=url, headers={}),
+                         {"message": "Injected error" if status != 404 else "Not found"})
+
+
+class FakePermit:
+    """
+    An offline, in-memory stand-in for the parts of the Permit API used by PermitServer,
+    with configurable latency and error injection, for benchmarks and local development.
+
+    It serves the resource instance, access request and operation approval endpoints through
+    an httpx transport, and stands in for the Permit SDK client (`api.users.get_by_id` and
+    `elements.login_as`, returning the SDK's models):
+
+        fake = FakePermit(latency=0.05, error_rate=0.01)
+        permit_server = PermitServer(mcp, permit=fake, transport=fake.transport)
+
+    Attributes:
+        calls: Number of calls per endpoint (route names, `users.get_by_id` and `elements.login_as`).
+    """
+
+    def __init__(
+        self,
+        resource_instances: int = 20,
+        users: int = 20,
+        access_requests: int = 100,
+        operation_approvals: int = 100,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        token_ttl: float = 3600.0,
+        seed: Optional[int] = 0,
+    ):
+        """
+        Args:
+            resource_instances: Number of seeded resource instances.
+            users: Number of seeded users.
+            access_requests: Number of seeded access requests.
+            operation_approvals: Number of seeded operation approvals.
+            latency: Seconds every call waits before responding.
+            jitter: Maximum random seconds added to `latency`.
+            error_rate: Probability (0-1) that a call fails with `error_status`.
+            error_status: Status code of injected errors.
+            token_ttl: Lifetime in seconds of element bearer tokens issued by `elements.login_as`.
+            seed: Seed of the random generator used for data, jitter and errors.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.token_ttl = token_ttl
+        self.calls: Counter = Counter()
+        self._random = random.Random(seed)
+        self._tokens: Dict[str, str] = {}
+
+        created_at = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+        self.users = {
+            f"user-{i}": UserRead(
+                id=uuid.UUID(int=i), key=f"user-{i}", first_name=f"User {i}", email=f"user-{i}@example.com",
+                attributes={}, organization_id=uuid.UUID(int=1), project_id=uuid.UUID(int=2),
+                environment_id=uuid.UUID(int=3), created_at=created_at, updated_at=created_at)
+            for i in range(users)
+        }
+        self.resource_instances = [
+            {"id": uuid.UUID(int=10_000 + i).hex, "key": str(i + 1), "resource": "restaurants",
+             "tenant": "default", "attributes": {"name": f"Restaurant {i + 1}", "allowed_for_children": i % 2 == 0}}
+            for i in range(resource_instances)
+        ]
+        user_ids = list(self.users) or ["user-0"]
+        self.access_requests = [self._new_item(
+            self._random.choice(user_ids), self._random.choice(_STATUSES), role="child-can-view")
+            for _ in range(access_requests)]
+        self.operation_approvals = [self._new_item(
+            self._random.choice(user_ids), self._random.choice(_STATUSES))
+            for _ in range(operation_approvals)]
+
+        self.transport = httpx.MockTransport(self._handle)
+        self.api = SimpleNamespace(users=SimpleNamespace(get_by_id=self._get_user))
+        self.elements = SimpleNamespace(login_as=self._login_as)
+
+    def _new_item(self, user_id: str, status: str, role: Optional[str] = None,
+                  resource_instance: Optional[str] = None, reason: str = "") -> Dict:
+        if resource_instance is None and self.resource_instances:
+            resource_instance = self._random.choice(
+                self.resource_instances)["key"]
+        details = {"tenant": "default", "resource": "restaurants",
+                   "resource_instance": resource_instance}
+        if role:
+            details["role"] = role
+        return {
+            "id": uuid.uuid4().hex,
+            "requesting_user_id": user_id,
+            "status": status,
+            "reason": reason,
+            "access_request_details": details,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime()),
+        }
+
+    def expire_tokens(self) -> None:
+        """
+        Invalidates every issued element bearer token, so the next elements call gets a 401.
+        """
+        self._tokens.clear()
+
+    async def _simulate(self, name: str) -> bool:
+        """
+        Counts the call, waits for the configured latency and returns whether it should fail.
+        """
+        self.calls[name] += 1
+        delay = self.latency + \
+            (self._random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return self.error_rate > 0 and self._random.random() < self.error_rate
+
+    async def _get_user(self, user_id: str) -> UserRead:
+        if await self._simulate("users.get_by_id"):
+            raise FakeApiError(self.error_status, f"/v2/users/{user_id}")
+        user = self.users.get(user_id)
+        if user is None:
+            raise FakeApiError(404, f"/v2/users/{user_id}")
+        return user.copy(deep=True)
+
+    async def _login_as(self, user_id: str, tenant_id: str) -> UserLoginAsResponse:
+        if await self._simulate("elements.login_as"):
+            raise FakeApiError(self.error_status, "/v2/auth/elements_login_as")
+        token = _make_token(user_id, self.token_ttl)
+        self._tokens[token] = user_id
+        # The bearer token is an extra field of the SDK's response model.
+        return UserLoginAsResponse(element_bearer_token=token, redirect_url="", content={"url": ""})
+
+    async def _handle(self, request: httpx.Request) -> httpx.Response:
+        for method, pattern, name in _ROUTES:
+            match = pattern.fullmatch(request.url.path)
+            if match and request.method == method:
+                break
+        else:
+            return httpx.Response(404, json={"message": "Not found"})
+
+        if await self._simulate(name):
+            return httpx.Response(self.error_status, json={"message": "Injected error"})
+
+        if "operation_approval" in name:
+            token = request.headers.get("authorization", "").removeprefix("Bearer ")
+            if token not in self._tokens:
+                return httpx.Response(401, json={"message": "Invalid token"})
+
+        params = request.url.params
+        body = json.loads(request.content) if request.content else {}
+        groups = match.groupdict()
+
+        if name == "list_resource_instances":
+            return self._page(self.resource_instances, params,
+                              wrap=params.get("include_total_count") == "true")
+        if name in ("list_access_requests", "list_operation_approvals"):
+            items = self.access_requests if name == "list_access_requests" else self.operation_approvals
+            return self._page(self._filter(items, params), params, wrap=True)
+        if name in ("create_access_request", "create_operation_approval"):
+            details = body.get("access_request_details", {})
+            user_id = groups.get("user_id") or self._tokens[token]
+            item = self._new_item(user_id, "pending", role=details.get("role"),
+                                  resource_instance=details.get("resource_instance"),
+                                  reason=body.get("reason", ""))
+            items = self.access_requests if name == "create_access_request" else self.operation_approvals
+            items.append(item)
+            return httpx.Response(200, json=item)
+
+        items = self.access_requests if name == "review_access_request" else self.operation_approvals
+        for item in items:
+            if item["id"] == groups["item_id"]:
+                item["status"] = "approved" if groups["action"] == "approve" else "denied"
+                if body.get("reviewer_comment"):
+                    item["reviewer_comment"] = body["reviewer_comment"]
+                return httpx.Response(200, json=item)
+        return httpx.Response(404, json={"message": "Not found"})
+
+    def _filter(self, items: List[Dict], params: httpx.QueryParams) -> List[Dict]:
+        status = params.get("status")
+        role = params.get("role")
+        resource_instance = params.get(
+            "resource_instance_id") or params.get("resource_instance")
+        # Like the Permit API, resource instances are matched by key or ID.
+        resource_instances = {resource_instance}
+        for instance in self.resource_instances:
+            if resource_instance in (instance["id"], instance["key"]):
+                resource_instances = {instance["id"], instance["key"]}
+        return [
+            item for item in items
+            if (not status or item["status"] == status)
+            and (not role or item["access_request_details"].get("role") == role)
+            and (not resource_instance
+                 or str(item["access_request_details"].get("resource_instance")) in resource_instances)
+        ]
+
+    @staticmethod
+    def _page(items: List[Dict], params: httpx.QueryParams, wrap: bool) -> httpx.Response:
+        page = int(params.get("page", 1))
+        per_page = int(params.get("per_page", 30))
+        data = items[(page - 1) * per_page:page * per_page]
+        if not wrap:
+            return httpx.Response(200, json=data)
+        return httpx.Response(200, json={
+            "data": data,
+            "total_count": len(items),
+            "page_count": -(-len(items) // per_page),
+        })
@@ -0,0 +1,110 @@
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Optional
+import json
+import logging
+import queue
+import random
+import sys
+
+# Structured fields of the per-call log records, passed as `extra`
+CALL_FIELDS = ("tool", "config", "status", "latency_ms", "items", "upstream_calls", "upstream_status")
+
+LOG_FORMATS = ("text", "json")
+
+
+class KeyValueFormatter(logging.Formatter):
+    """
+    Formats records as their message followed by their structured fields as key=value pairs.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = super().format(record)
+        fields = " ".join(f"{name}={getattr(record, name)}" for name in CALL_FIELDS
+                          if getattr(record, name, None) is not None)
+        return f"{message} {fields}" if fields else message
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats records as one JSON object per line, with their structured fields as keys.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for name in CALL_FIELDS:
+            value = getattr(record, name, None)
+            if value is not None:
+                data[name] = value
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str)
+
+
+class PayloadLogger:
+    """
+    Logs a sample of the tool results at DEBUG, truncated to `max_chars` characters.
+
+    Nothing is serialized unless the logger is enabled for DEBUG, so payload logging costs
+    a level check per call when it is off.
+    """
+
+    def __init__(self, logger: logging.Logger, sample_rate: float = 0.1, max_chars: int = 2000):
+        """
+        Args:
+            logger: The logger the payloads are written to.
+            sample_rate: Fraction of the calls whose result is logged, between 0 and 1.
+            max_chars: Maximum number of characters of a logged payload.
+        """
+        self.logger = logger
+        self.sample_rate = min(1.0, max(0.0, sample_rate))
+        self.max_chars = max(0, max_chars)
+
+    def log(self, tool: str, payload: Any) -> None:
+        if not self.logger.isEnabledFor(logging.DEBUG) or random.random() >= self.sample_rate:
+            return
+        text = json.dumps(payload, default=str)
+        if len(text) > self.max_chars:
+            text = f"{text[:self.max_chars]}... ({len(text) - self.max_chars} more characters)"
+        self.logger.debug("%s returned %s", tool, text, extra={"tool": tool})
+
+
+def configure_logging(level: int = logging.INFO, log_format: str = "text") -> QueueListener:
+    """
+    Routes the root logger through a queue to a stderr handler running in a background
+    thread, so that formatting and writing logs never block the event loop.
+
+    Returns the started listener; stop it on shutdown to flush the queued records.
+    """
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JsonFormatter() if log_format == "json" else KeyValueFormatter("%(message)s"))
+    log_queue: "queue.SimpleQueue" = queue.SimpleQueue()
+    listener = QueueListener(log_queue, handler, respect_handler_level=True)
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(level)
+    if level > logging.DEBUG:
+        # The per-call records carry the upstream status, so skip httpx's line per request.
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+    listener.start()
+    return listener
+
+
+def item_count(result: Any) -> Optional[int]:
+    """
+    Returns the number of items in a tool result, or None if it is not a listing.
+    """
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, dict):
+        for key in ("items", "results"):
+            if isinstance(result.get(key), list):
+                return len(result[key])
+    return None
@@ -0,0 +1,44 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Tuple
+
+import anyio
+from mcp.server.fastmcp import FastMCP
+from mcp.shared.memory import create_client_server_memory_streams
+
+
+@asynccontextmanager
+async def memory_transport(mcp: FastMCP, raise_exceptions: bool = False) -> AsyncIterator[Tuple]:
+    """
+    Runs a FastMCP server (e.g. one with the PermitServer tools) in this process and yields
+    the read and write streams of a client connected to it, like `stdio_client` does for a
+    server subprocess:
+
+        async with memory_transport(mcp) as (read, write):
+            async with ClientSession(read, write) as session:
+                ...
+
+    Messages are passed as objects through memory streams, without a subprocess, pipes or
+    JSON serialization.
+
+    Args:
+        mcp: The FastMCP instance to serve.
+        raise_exceptions: Whether exceptions raised by the server are raised instead of
+            being returned to the client as errors.
+    """
+    # FastMCP does not expose its low-level server, mcp.shared.memory reads it the same way.
+    server = mcp._mcp_server
+    async with create_client_server_memory_streams() as (client_streams, server_streams):
+        server_read, server_write = server_streams
+        async with anyio.create_task_group() as task_group:
+            task_group.start_soon(
+                lambda: server.run(
+                    server_read,
+                    server_write,
+                    server.create_initialization_options(),
+                    raise_exceptions=raise_exceptions,
+                )
+            )
+            try:
+                yield client_streams
+            finally:
+                task_group.cancel_scope.cancel()
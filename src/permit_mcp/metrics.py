@@ -0,0 +1,166 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import bisect
+import math
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+                   0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(labels: Sequence[Tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in labels)
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, value: float = 1.0, **labels) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        self._values[key] = self._values.get(key, 0.0) + value
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(str(labels[name]) for name in self.labelnames), 0.0)
+
+    def samples(self) -> Iterable[Tuple[str, List[Tuple[str, str]], float]]:
+        for key, value in sorted(self._values.items()):
+            yield self.name, list(zip(self.labelnames, key)), value
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: a count per bucket (plus +Inf), the sum and the count.
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        state[0][bisect.bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+
+    def samples(self) -> Iterable[Tuple[str, List[Tuple[str, str]], float]]:
+        for key, (bucket_counts, total, count) in sorted(self._values.items()):
+            labels = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), bucket_counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket", labels + [("le", _format_value(bound))], cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+
+class MetricsRegistry:
+    """
+    A minimal in-process metrics registry rendered in the Prometheus text exposition format.
+    """
+
+    def __init__(self):
+        self._metrics: List = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self, gauges: Optional[Dict[str, Tuple[str, float]]] = None) -> str:
+        """
+        Renders every metric, plus point-in-time gauges given as `{name: (help, value)}`.
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(
+                    f"{name}{_format_labels(labels)} {_format_value(value)}")
+        for name, (documentation, value) in (gauges or {}).items():
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class ServerMetrics(MetricsRegistry):
+    """
+    The metrics recorded by PermitServer.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.tool_calls = self.counter(
+            "permit_mcp_tool_calls_total",
+            "Number of tool calls by tool and outcome.",
+            ("tool", "status"))
+        self.tool_duration = self.histogram(
+            "permit_mcp_tool_duration_seconds",
+            "Total tool call latency.",
+            ("tool",))
+        self.upstream_duration = self.histogram(
+            "permit_mcp_upstream_request_duration_seconds",
+            "Latency of HTTP requests to the Permit API.",
+            ("tool", "method"))
+        self.upstream_responses = self.counter(
+            "permit_mcp_upstream_responses_total",
+            "Responses from the Permit API by status code ('error' when no response was received).",
+            ("tool", "status_code"))
+        self.upstream_retries = self.counter(
+            "permit_mcp_upstream_retries_total",
+            "Retried requests to the Permit API.",
+            ("tool", "method"))
+        self.upstream_rejections = self.counter(
+            "permit_mcp_upstream_rejections_total",
+            "Requests failed fast because the endpoint's circuit breaker was open.",
+            ("tool",))
+        self.upstream_coalesced = self.counter(
+            "permit_mcp_upstream_coalesced_total",
+            "Read requests served by an identical request already in flight.",
+            ("tool",))
+        self.enrichment_duration = self.histogram(
+            "permit_mcp_enrichment_duration_seconds",
+            "Time spent attaching requesting users to list results.",
+            ("tool",))
@@ -0,0 +1,244 @@
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+import asyncio
+import hashlib
+import json
+import logging
+import time
+
+import aiosqlite
+
+from . import codec
+
+logger = logging.getLogger(__name__)
+
+# (configuration, kind, user ID): the requests listed for a user in a configuration
+Scope = Tuple[str, str, str]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS requests (
+    config TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    status TEXT,
+    hash TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (config, kind, user_id, id)
+);
+CREATE INDEX IF NOT EXISTS requests_status ON requests (config, kind, user_id, status, position);
+CREATE TABLE IF NOT EXISTS syncs (
+    config TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    synced_at REAL NOT NULL,
+    PRIMARY KEY (config, kind, user_id)
+);
+"""
+
+
+class RequestMirror:
+    """
+    A local SQLite copy of the access requests and operation approvals listed by each user,
+    kept up to date by a background sync and queried through an index on status.
+
+    A scope (configuration, kind and user) is synced when a listing finds it stale, and then
+    at most every `sync_interval` seconds while it keeps being listed: a scope is only synced
+    again if it was listed since its last sync, less than `scope_ttl` seconds ago. Every sync
+    reads every page of the scope, as the Permit API has no change cursor. Listings are only
+    served from the mirror while the scope was synced less than `max_staleness` seconds ago.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        sync: Callable[[Scope], Awaitable[List[Dict]]],
+        max_staleness: float = 30.0,
+        sync_interval: float = 10.0,
+        scope_ttl: Optional[float] = None,
+        sync_concurrency: int = 4,
+    ):
+        """
+        Args:
+            path: Path of the SQLite database file, or ":memory:".
+            sync: Coroutine function returning every request of a scope, in listing order.
+            max_staleness: Maximum age in seconds of a sync to serve listings from the mirror.
+            sync_interval: Minimum seconds between background syncs of a scope.
+            scope_ttl: Seconds after its last listing at which a scope stops being synced
+                (default: `max_staleness`).
+            sync_concurrency: Maximum number of scopes synced concurrently.
+        """
+        self.path = path
+        self._sync = sync
+        self.max_staleness = max_staleness
+        self.sync_interval = sync_interval
+        self.scope_ttl = max_staleness if scope_ttl is None else scope_ttl
+        self._db: Optional[aiosqlite.Connection] = None
+        self._open_lock = asyncio.Lock()
+        self._synced_at: Dict[Scope, float] = {}
+        self._listed_at: Dict[Scope, float] = {}
+        self._stale_marks: Dict[Scope, int] = {}
+        self._syncing: Set[Scope] = set()
+        self._semaphore = asyncio.Semaphore(max(1, sync_concurrency))
+        self._task: Optional[asyncio.Task] = None
+        self._sync_tasks: Set[asyncio.Task] = set()
+        self.stats = {"hits": 0, "misses": 0, "syncs": 0, "sync_errors": 0, "rows_written": 0}
+
+    async def _connection(self) -> aiosqlite.Connection:
+        if self._db is None:
+            async with self._open_lock:
+                if self._db is None:
+                    db = await aiosqlite.connect(self.path)
+                    await db.executescript(_SCHEMA)
+                    await db.commit()
+                    async with db.execute("SELECT config, kind, user_id, synced_at FROM syncs") as cursor:
+                        async for config, kind, user_id, synced_at in cursor:
+                            self._synced_at[(config, kind, user_id)] = synced_at
+                    self._db = db
+        return self._db
+
+    def is_fresh(self, scope: Scope) -> bool:
+        return time.time() - self._synced_at.get(scope, 0.0) <= self.max_staleness
+
+    async def query(
+        self,
+        scope: Scope,
+        status: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> Optional[List[Dict]]:
+        """
+        Returns the requests of the scope with the given status, in listing order, or None if
+        the scope is not fresh enough to be served from the mirror.
+        """
+        db = await self._connection()
+        self._listed_at[scope] = time.time()
+        self._start()
+        if not self.is_fresh(scope):
+            self.stats["misses"] += 1
+            self.request_sync(scope)
+            return None
+
+        sql = "SELECT data FROM requests WHERE config = ? AND kind = ? AND user_id = ?"
+        params: list = list(scope)
+        if status is not None:
+            sql += " AND status = ?"
+            params.append(status)
+        sql += " ORDER BY position LIMIT ? OFFSET ?"
+        params += [limit if limit is not None else -1, max(0, offset)]
+
+        async with db.execute(sql, params) as cursor:
+            rows = await cursor.fetchall()
+        self.stats["hits"] += 1
+        return [codec.loads(data) for (data,) in rows]
+
+    async def replace(self, scope: Scope, items: List[Dict]) -> int:
+        """
+        Replaces the requests of a scope, writing only the rows that changed, and returns the
+        number of rows written or deleted.
+        """
+        db = await self._connection()
+        async with db.execute(
+                "SELECT id, position, hash FROM requests WHERE config = ? AND kind = ? AND user_id = ?", scope) as cursor:
+            existing = {row[0]: (row[1], row[2]) async for row in cursor}
+
+        upserts = []
+        seen = set()
+        for position, item in enumerate(items):
+            item_id = str(item.get("id"))
+            if item_id in seen:
+                continue
+            seen.add(item_id)
+            data = json.dumps(item, sort_keys=True, separators=(",", ":"))
+            digest = hashlib.sha1(data.encode()).hexdigest()
+            if existing.get(item_id) != (position, digest):
+                upserts.append((*scope, item_id, position, item.get("status"), digest, data))
+        deletes = [(*scope, item_id) for item_id in existing.keys() - seen]
+
+        if upserts:
+            await db.executemany(
+                "INSERT OR REPLACE INTO requests (config, kind, user_id, id, position, status, hash, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", upserts)
+        if deletes:
+            await db.executemany(
+                "DELETE FROM requests WHERE config = ? AND kind = ? AND user_id = ? AND id = ?", deletes)
+        synced_at = time.time()
+        await db.execute("INSERT OR REPLACE INTO syncs (config, kind, user_id, synced_at) VALUES (?, ?, ?, ?)",
+                         (*scope, synced_at))
+        await db.commit()
+        self._synced_at[scope] = synced_at
+        self.stats["rows_written"] += len(upserts) + len(deletes)
+        return len(upserts) + len(deletes)
+
+    async def sync(self, scope: Scope) -> None:
+        """
+        Fetches the requests of a scope and applies the changes to the mirror.
+        """
+        if scope in self._syncing:
+            return
+        self._syncing.add(scope)
+        try:
+            async with self._semaphore:
+                stale_marks = self._stale_marks.get(scope, 0)
+                changed = await self.replace(scope, await self._sync(scope))
+                if self._stale_marks.get(scope, 0) != stale_marks:
+                    # The scope changed while it was being fetched.
+                    self._synced_at[scope] = 0.0
+            self.stats["syncs"] += 1
+            logger.debug(f"Synced {scope} with {changed} changes")
+        except Exception as error:
+            self.stats["sync_errors"] += 1
+            logger.warning(f"Failed to sync {scope}: {error}")
+        finally:
+            self._syncing.discard(scope)
+
+    def request_sync(self, scope: Scope) -> None:
+        """
+        Starts syncing a scope in the background, and the periodic sync if needed.
+        """
+        self._listed_at.setdefault(scope, time.time())
+        self._start()
+        if scope not in self._syncing:
+            task = asyncio.create_task(self.sync(scope))
+            self._sync_tasks.add(task)
+            task.add_done_callback(self._sync_tasks.discard)
+
+    def _start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._sync_periodically())
+
+    def mark_stale(self, config: str, kind: str) -> None:
+        """
+        Stops serving the scopes of a configuration and kind from the mirror until their next
+        sync, e.g. after a request was created or reviewed.
+        """
+        for scope in list(self._synced_at):
+            if scope[:2] == (config, kind):
+                self._synced_at[scope] = 0.0
+                self._stale_marks[scope] = self._stale_marks.get(scope, 0) + 1
+
+    async def _sync_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            now = time.time()
+            for scope, listed_at in list(self._listed_at.items()):
+                if now - listed_at > self.scope_ttl:
+                    del self._listed_at[scope]
+            # Only the scopes listed since their last sync are synced again.
+            await asyncio.gather(*(
+                self.sync(scope) for scope, listed_at in list(self._listed_at.items())
+                if listed_at > self._synced_at.get(scope, 0.0)))
+
+    async def close(self) -> None:
+        """
+        Stops the background sync and closes the database.
+        """
+        tasks = list(self._sync_tasks) + \
+            ([self._task] if self._task is not None else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
@@ -0,0 +1,100 @@
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Union
+
+# Requested in `fields` to return the full Permit objects
+ALL_FIELDS = "*"
+
+_MISSING = object()
+
+Field = Union[str, Callable[[Dict], Any]]
+
+
+def requester_name(item: Dict) -> Optional[str]:
+    """
+    Returns a display name for the requesting user attached to an item, falling back to
+    the user's email, key or ID.
+    """
+    user = item.get("requesting_user") or {}
+    name = " ".join(filter(None, (user.get("first_name"), user.get("last_name"))))
+    return name or user.get("email") or user.get("key") or item.get("requesting_user_id")
+
+
+def _get_path(item: Dict, path: str) -> Any:
+    value: Any = item
+    for name in path.split("."):
+        if not isinstance(value, dict) or name not in value:
+            return _MISSING
+        value = value[name]
+    return value
+
+
+class Projection:
+    """
+    Selects the fields of the items returned by a list tool.
+
+    Fields are top-level names, dotted paths into nested objects (e.g. "attributes.name")
+    or aliases defined by the tool. Items are reduced to `default_fields` unless other
+    fields are requested, and `ALL_FIELDS` returns them unchanged.
+    """
+
+    def __init__(self, default_fields: Sequence[str], aliases: Optional[Mapping[str, Field]] = None):
+        self.default_fields = tuple(default_fields)
+        self.aliases = dict(aliases or {})
+
+    def resolve(self, fields: Optional[Sequence[str]]) -> Optional[List[str]]:
+        """
+        Returns the fields to keep, or None to keep the items unchanged.
+        """
+        if not fields:
+            return list(self.default_fields)
+        if ALL_FIELDS in fields:
+            return None
+        return list(dict.fromkeys(fields))
+
+    @staticmethod
+    def needs_requesting_user(fields: Optional[List[str]]) -> bool:
+        """
+        Returns whether the resolved fields read the requesting user attached to the items.
+        """
+        if fields is None:
+            return True
+        return any(field == "requester" or field == "requesting_user" or field.startswith("requesting_user.")
+                   for field in fields)
+
+    def apply(self, items: List[Dict], fields: Optional[List[str]]) -> List[Dict]:
+        """
+        Projects the items on the resolved fields. Fields that are missing or null are omitted.
+        """
+        if fields is None:
+            return items
+        getters = [(field, self.aliases.get(field, field)) for field in fields]
+        projected = []
+        for item in items:
+            result = {}
+            for field, getter in getters:
+                value = getter(item) if callable(getter) else _get_path(item, getter)
+                if value is not _MISSING and value is not None:
+                    result[field] = value
+            projected.append(result)
+        return projected
+
+
+_REQUEST_ALIASES: Dict[str, Field] = {
+    "tenant": "access_request_details.tenant",
+    "resource": "access_request_details.resource",
+    "resource_instance": "access_request_details.resource_instance",
+    "role": "access_request_details.role",
+    "requester": requester_name,
+}
+
+RESOURCE_INSTANCES = Projection(
+    ("id", "key", "resource", "tenant", "attributes"))
+
+ACCESS_REQUESTS = Projection(
+    ("id", "status", "role", "resource_instance", "reason",
+     "requesting_user_id", "requester", "created_at"),
+    _REQUEST_ALIASES)
+
+OPERATION_APPROVALS = Projection(
+    ("id", "status", "resource_instance", "reason",
+     "requesting_user_id", "requester", "created_at"),
+    _REQUEST_ALIASES)
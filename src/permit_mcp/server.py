@@ -1,57 +1,1296 @@
-from typing import List, Dict, Optional, Callable, Union
+from collections import Counter
+from typing import TYPE_CHECKING, List, Dict, Literal, Optional, Callable, Union, Awaitable, Tuple
+from urllib.parse import urlsplit
+import anyio
+import asyncio
+import base64
+import contextvars
+import functools
 import httpx
+import importlib
+import inspect
 import json
+import math
 import os
+import sys
+import time
+import weakref
 from mcp.server.fastmcp import FastMCP
 from mcp.server.fastmcp.exceptions import ToolError
 
-from permit import Permit
-from dotenv import load_dotenv
 import logging
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(message)s",
-)
+if __name__ == "__main__" and not __package__:
+    # Run as a script (`uv --directory src/permit_mcp run server.py`): make the package importable.
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-logger = logging.getLogger(__name__)
+from permit_mcp import codec
+from permit_mcp.cache import MISSING, TTLCache
+from permit_mcp.catalog import ResourceCatalog
+from permit_mcp.config import PermitConfig, configs_from_env
+from permit_mcp.logs import LOG_FORMATS, PayloadLogger, configure_logging, item_count
+from permit_mcp.metrics import ServerMetrics
+from permit_mcp.projection import ACCESS_REQUESTS, OPERATION_APPROVALS, RESOURCE_INSTANCES
+from permit_mcp.upstream import CircuitBreaker, RetryPolicy, TokenBucket, parse_retry_after
+from permit_mcp.watch import PendingPoller
+
+if TYPE_CHECKING:
+    from permit import Permit
 
-# Load environment variables
-load_dotenv()
+logger = logging.getLogger(__name__)
+# One structured record per tool call, at INFO
+call_logger = logging.getLogger("permit_mcp.calls")
+# Sampled tool results, at DEBUG
+payload_logger = logging.getLogger("permit_mcp.payloads")
+
+# Defaults for the shared HTTP client used to talk to the Permit API
+DEFAULT_HTTP_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+DEFAULT_HTTP_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=20,
+    keepalive_expiry=30.0,
+)
 
-# Environment variables
-PERMIT_PDP_URL = os.getenv("PERMIT_PDP_URL", 'https://cloudpdp.api.permit.io')
-TENANT = os.getenv("TENANT", 'default')
 
-RESOURCE_KEY = os.getenv('RESOURCE_KEY')
-PERMIT_API_KEY = os.getenv("PERMIT_API_KEY")
-PROJECT_ID = os.getenv("PROJECT_ID")
-ENV_ID = os.getenv("ENV_ID")
-OPERATION_ELEMENTS_CONFIG_ID = os.getenv('OPERATION_ELEMENTS_CONFIG_ID')
-ACCESS_ELEMENTS_CONFIG_ID = os.getenv("ACCESS_ELEMENTS_CONFIG_ID")
+def _jwt_expires_in(token: str) -> Optional[float]:
+    """
+    Returns the seconds until a JWT expires, read from its unverified `exp` claim,
+    or None if the token is not a JWT with an expiry.
+    """
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+        return float(claims["exp"]) - time.time()
+    except (IndexError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _plain_user(user) -> Dict:
+    """
+    Returns a user from the Permit SDK, a pydantic model, as a JSON-compatible dict, so that
+    it can be projected on dotted fields, cached and serialized like the listed items.
+    """
+    if isinstance(user, dict):
+        return user
+    if hasattr(user, "model_dump"):
+        return user.model_dump(mode="json")
+    # pydantic v1 models (the Permit SDK's) serialize UUIDs and datetimes only through json()
+    return codec.loads(user.json())
+
+
+# Permit API resources that get their own circuit breaker
+UPSTREAM_ENDPOINTS = ("resource_instances", "access_requests", "operation_approval")
+
+# Name of the tool being executed, used to attribute upstream calls in metrics
+_current_tool: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "permit_mcp_current_tool", default="")
+
+# Upstream calls and last upstream status of the tool call being executed, for its log record
+_call_stats: contextvars.ContextVar[Optional[Dict]] = contextvars.ContextVar(
+    "permit_mcp_call_stats", default=None)
+
+# Configuration of the tool call being executed
+_current_partition: contextvars.ContextVar[Optional["_Partition"]] = contextvars.ContextVar(
+    "permit_mcp_current_partition", default=None)
+
+# Kinds of requests kept in the request mirror
+ACCESS_REQUESTS_KIND = "access_requests"
+OPERATION_APPROVALS_KIND = "operation_approvals"
+
+# Tool that binds an MCP session to a configuration, registered with several configurations
+USE_CONFIGURATION_TOOL = "use_permit_configuration"
+
+
+class _Partition:
+    """
+    The state PermitServer keeps per configuration: the Permit SDK client, the HTTP client
+    and its connection pool, the caches, the catalog, the circuit breakers and the rate limiter.
+    """
+
+    def __init__(self, name: str, config: PermitConfig, permit: Optional["Permit"] = None):
+        self.name = name
+        self.config = config
+        self.permit = permit
+        self.client: Optional[httpx.AsyncClient] = None
+        self.user_cache: Optional[TTLCache] = None
+        self.element_tokens: Optional[TTLCache] = None
+        self.element_logins: Dict[tuple, asyncio.Future] = {}
+        self.catalog: Optional[ResourceCatalog] = None
+        self.circuit_breakers: Dict[str, CircuitBreaker] = {}
+        self.rate_limiter: Optional[TokenBucket] = None
 
 
 class PermitServer:
-    def __init__(self, mcp: FastMCP, exclude_tools=None):
+    def __init__(
+        self,
+        mcp: FastMCP,
+        exclude_tools=None,
+        *,
+        http_timeout: Optional[httpx.Timeout] = None,
+        http_limits: Optional[httpx.Limits] = None,
+        http2: bool = False,
+        user_lookup_concurrency: int = 10,
+        user_cache_size: int = 0,
+        user_cache_ttl: float = 300.0,
+        user_cache_negative_ttl: float = 60.0,
+        element_token_ttl: float = 300.0,
+        element_token_refresh_margin: float = 30.0,
+        page_fetch_concurrency: int = 4,
+        fetch_all_max_items: int = 1000,
+        catalog_refresh_interval: float = 300.0,
+        catalog_max_items: int = 10000,
+        permit: Optional["Permit"] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+        retry_backoff_max: float = 10.0,
+        circuit_failure_threshold: int = 5,
+        circuit_reset_timeout: float = 30.0,
+        rate_limit: Optional[float] = None,
+        rate_limit_burst: Optional[int] = None,
+        bulk_concurrency: int = 10,
+        bulk_max_items: int = 100,
+        coalesce_reads: bool = True,
+        configs: Optional[Dict[str, PermitConfig]] = None,
+        default_config: Optional[str] = None,
+        mirror_path: Optional[str] = None,
+        mirror_max_staleness: float = 30.0,
+        mirror_sync_interval: float = 10.0,
+        mirror_max_items: int = 10000,
+        mirror_scope_ttl: Optional[float] = None,
+        watch_poll_interval: float = 5.0,
+        watch_max_timeout: float = 60.0,
+        payload_log_sample_rate: float = 0.1,
+        payload_log_max_chars: int = 2000,
+        warm_up_users: Optional[List[str]] = None,
+    ):
+        """
+        Args:
+            mcp: The FastMCP instance the Permit tools are registered on.
+            exclude_tools: Optional list of tool names that should not be registered.
+            http_timeout: Timeouts for requests to the Permit API (default: 10s, 5s to connect).
+            http_limits: Connection pool limits of the shared HTTP client.
+            http2: Enable HTTP/2 for the shared HTTP client. Requires the `h2` package (`permit-mcp[http2]`).
+            user_lookup_concurrency: Maximum number of concurrent user lookups when listing requests (default: 10).
+            user_cache_size: Maximum number of requesting users kept in memory. The cache is disabled when 0 (default).
+            user_cache_ttl: Seconds a cached user stays valid (default: 300).
+            user_cache_negative_ttl: Seconds an unknown user ID is remembered as missing (default: 60).
+            element_token_ttl: Seconds an element bearer token is reused when its expiry cannot be read from it (default: 300).
+            element_token_refresh_margin: Seconds before expiry at which an element bearer token is renewed (default: 30).
+            page_fetch_concurrency: Maximum number of pages fetched concurrently by `fetch_all` list calls (default: 4).
+            fetch_all_max_items: Maximum number of items returned by a `fetch_all` list call (default: 1000).
+            catalog_refresh_interval: Seconds between background refreshes of the resource instance catalog (default: 300).
+            catalog_max_items: Maximum number of resource instances kept in the catalog (default: 10000).
+            permit: Optional Permit SDK client to use for every configuration instead of one built from
+                the configuration on first use.
+            transport: Optional httpx transport for the shared HTTP client, e.g. to route requests to a fake Permit API.
+            max_retries: Maximum number of retries of a failed Permit API request (default: 3).
+                Only idempotent requests are retried on 5xx responses; any request is retried on a 429.
+            retry_backoff: Base delay in seconds of the jittered exponential backoff between retries (default: 0.5).
+            retry_backoff_max: Maximum delay in seconds between retries. A longer `Retry-After` is not waited for (default: 10).
+            circuit_failure_threshold: Consecutive failures after which requests to a Permit API endpoint fail fast (default: 5).
+            circuit_reset_timeout: Seconds an endpoint fails fast before a trial request is sent (default: 30).
+            rate_limit: Optional maximum average number of Permit API requests per second.
+            rate_limit_burst: Maximum burst of requests allowed by `rate_limit` (default: the rate, rounded down).
+            bulk_concurrency: Maximum number of concurrent reviews sent by the bulk approve/deny tools (default: 10).
+            bulk_max_items: Maximum number of IDs accepted by a bulk approve/deny call (default: 100).
+            coalesce_reads: Whether identical concurrent reads (same URL, parameters and caller) and user lookups share a single upstream call (default: True).
+            configs: Optional named configurations to serve (default: a single "default" configuration read
+                from the environment variables). Each configuration gets its own connection pool, caches,
+                catalog, circuit breakers and rate limit. With several configurations, every tool takes an
+                optional `config` argument and MCP sessions can select one with `use_permit_configuration`.
+            default_config: Name of the configuration used when a call selects none (default: the first one).
+            mirror_path: Optional path of a SQLite database (or ":memory:") mirroring the access requests and
+                operation approvals listed by each user. Listings are then served from the mirror while it is fresh.
+                The mirror is disabled when not set (default).
+            mirror_max_staleness: Maximum age in seconds of the mirror to serve listings from it (default: 30).
+            mirror_sync_interval: Minimum seconds between background syncs of a user's requests (default: 10).
+            mirror_max_items: Maximum number of requests mirrored per user and kind (default: 10000).
+            mirror_scope_ttl: Seconds after the last listing of a user's requests at which they stop being synced
+                (default: `mirror_max_staleness`).
+            watch_poll_interval: Seconds between polls of the pending requests watched by `wait_for_pending_requests` (default: 5).
+                Every session waiting on the same user and kind shares one poll.
+            watch_max_timeout: Maximum number of seconds a `wait_for_pending_requests` call waits (default: 60).
+            payload_log_sample_rate: Fraction of the tool results logged when the `permit_mcp.payloads` logger
+                is enabled for DEBUG (default: 0.1). Results are never serialized for logging otherwise.
+            payload_log_max_chars: Maximum number of characters of a logged tool result (default: 2000).
+            warm_up_users: Optional IDs of frequent users and reviewers whose element tokens (and, with the
+                user cache, user details) are loaded by `warm_up`.
+        """
         self.mcp = mcp
-        self.permit = Permit(
-            pdp=PERMIT_PDP_URL,
-            token=PERMIT_API_KEY,
-        )
         self.exclude_tools = exclude_tools if exclude_tools else []
+        self.configs = dict(configs) if configs else {
+            "default": PermitConfig.from_env()}
+        self.default_config = default_config if default_config else next(
+            iter(self.configs))
+        if self.default_config not in self.configs:
+            raise ValueError(
+                f"Unknown default configuration {self.default_config!r}")
+
+        self.http_timeout = http_timeout if http_timeout else DEFAULT_HTTP_TIMEOUT
+        self.http_limits = http_limits if http_limits else DEFAULT_HTTP_LIMITS
+        self.http2 = http2
+        self.transport = transport
+        self.retry_policy = RetryPolicy(
+            max_retries, backoff=retry_backoff, backoff_max=retry_backoff_max)
+        self.circuit_failure_threshold = circuit_failure_threshold
+        self.circuit_reset_timeout = circuit_reset_timeout
+        self.rate_limit = rate_limit
+        self.rate_limit_burst = rate_limit_burst
+        self.bulk_concurrency = max(1, bulk_concurrency)
+        self.bulk_max_items = max(1, bulk_max_items)
+        self.coalesce_reads = coalesce_reads
+        self._reads: Dict[tuple, asyncio.Future] = {}
+        self._user_lookups: Dict[tuple, asyncio.Future] = {}
+        self.user_lookup_concurrency = max(1, user_lookup_concurrency)
+        self.user_cache_size = user_cache_size
+        self.user_cache_ttl = user_cache_ttl
+        self.user_cache_negative_ttl = user_cache_negative_ttl
+        self.element_token_ttl = element_token_ttl
+        self.element_token_refresh_margin = element_token_refresh_margin
+        self.page_fetch_concurrency = max(1, page_fetch_concurrency)
+        self.fetch_all_max_items = max(1, fetch_all_max_items)
+        self.catalog_max_items = max(1, catalog_max_items)
+        self.catalog_refresh_interval = catalog_refresh_interval
+        self._partitions = {name: self._create_partition(name, config, permit)
+                            for name, config in self.configs.items()}
+        self._session_configs: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        self.mirror_max_items = max(1, mirror_max_items)
+        self.mirror = None
+        if mirror_path:
+            # Imported here so that aiosqlite is only loaded when the mirror is enabled.
+            from permit_mcp.mirror import RequestMirror
+
+            self.mirror = RequestMirror(
+                mirror_path,
+                self._sync_mirror_scope,
+                max_staleness=mirror_max_staleness,
+                sync_interval=mirror_sync_interval,
+                scope_ttl=mirror_scope_ttl,
+            )
+        self.watch_poll_interval = watch_poll_interval
+        self.watch_max_timeout = max(0.0, watch_max_timeout)
+        self._pollers: Dict[Tuple[str, str, str], PendingPoller] = {}
+        self.warm_up_users = list(warm_up_users or [])
+        self.warm_up_timings: Dict[str, float] = {}
+        self._warm_up_task: Optional[asyncio.Task] = None
+        self.payload_logger = PayloadLogger(
+            payload_logger, payload_log_sample_rate, payload_log_max_chars)
+        self.metrics = ServerMetrics()
+        self._http_stats = {
+            "clients_created": 0,
+            "requests_total": 0,
+            "requests_in_flight": 0,
+            "requests_in_flight_peak": 0,
+        }
+
         self.register_tools()
 
+    def _create_partition(self, name: str, config: PermitConfig, permit: Optional["Permit"]) -> _Partition:
+        partition = _Partition(name, config, permit)
+        if self.user_cache_size > 0:
+            partition.user_cache = TTLCache(
+                self.user_cache_size, self.user_cache_ttl, negative_ttl=self.user_cache_negative_ttl)
+        partition.element_tokens = TTLCache(1024, self.element_token_ttl)
+        if self.rate_limit:
+            partition.rate_limiter = TokenBucket(
+                self.rate_limit, self.rate_limit_burst)
+
+        async def load_resource_instances() -> List[Dict]:
+            token = _current_partition.set(partition)
+            try:
+                return await self._load_resource_instances()
+            finally:
+                _current_partition.reset(token)
+
+        partition.catalog = ResourceCatalog(
+            load_resource_instances, refresh_interval=self.catalog_refresh_interval)
+        return partition
+
+    def _partition(self) -> _Partition:
+        """
+        Returns the partition of the configuration selected for the current tool call.
+        """
+        partition = _current_partition.get()
+        return partition if partition is not None else self._partitions[self.default_config]
+
+    def _config(self) -> PermitConfig:
+        return self._partition().config
+
+    def _current_session(self):
+        try:
+            return self.mcp.get_context().session
+        except (LookupError, ValueError):
+            # Not called from an MCP request, e.g. a tool called directly.
+            return None
+
+    def _select_partition(self, config: Optional[str] = None) -> _Partition:
+        """
+        Returns the partition of the configuration named by the call, else the one bound
+        to the MCP session, else the one already selected, else the default one.
+        """
+        if config is None:
+            session = self._current_session()
+            if session is not None:
+                config = self._session_configs.get(session)
+        if config is None:
+            return self._partition()
+        partition = self._partitions.get(config)
+        if partition is None:
+            raise ToolError(
+                f"Unknown configuration {config!r}, expected one of: {', '.join(self._partitions)}.")
+        return partition
+
+    @property
+    def permit(self) -> "Permit":
+        """
+        The Permit SDK client of the current configuration, created on first use because
+        importing the SDK is slow.
+        """
+        return self._partition_permit(self._partition())
+
+    @staticmethod
+    def _partition_permit(partition: _Partition) -> "Permit":
+        if partition.permit is None:
+            from permit import Permit
+
+            partition.permit = Permit(
+                pdp=partition.config.pdp_url,
+                token=partition.config.api_key,
+            )
+        return partition.permit
+
+    @property
+    def user_cache(self) -> Optional[TTLCache]:
+        """
+        The user cache of the current configuration, or None when disabled.
+        """
+        return self._partition().user_cache
+
+    @property
+    def catalog(self) -> ResourceCatalog:
+        """
+        The resource instance catalog of the current configuration.
+        """
+        return self._partition().catalog
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """
+        Returns the shared HTTP client of the current configuration, creating it on first
+        use so that connections are kept alive and reused across tool calls.
+        """
+        partition = self._partition()
+        if partition.client is None or partition.client.is_closed:
+            http2 = self.http2
+            if http2:
+                try:
+                    import h2  # noqa: F401
+                except ImportError:
+                    logger.warning(
+                        "HTTP/2 requested but the 'h2' package is not installed, falling back to HTTP/1.1")
+                    http2 = False
+
+            partition.client = httpx.AsyncClient(
+                timeout=self.http_timeout,
+                limits=self.http_limits,
+                http2=http2,
+                transport=self.transport,
+            )
+            self._http_stats["clients_created"] += 1
+        return partition.client
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Sends a request to the Permit API through the shared HTTP client. Identical
+        concurrent GET requests share a single upstream request when `coalesce_reads` is set.
+
+        Raises:
+            ToolError: If the response status code is not 2xx.
+        """
+        async def send() -> httpx.Response:
+            response = await self._send(method, url, **kwargs)
+            self._raise_for_status(response)
+            return response
+
+        if method != "GET" or not self.coalesce_reads:
+            return await send()
+        subject = (kwargs.get("headers") or {}).get("authorization")
+        return await self._coalesce(self._read_key(url, kwargs.get("params"), subject), send)
+
+    async def _element_request(self, user_id: str, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Sends a request to the Permit Elements API on behalf of a user, authenticated with
+        the user's cached element bearer token. If the token is rejected with a 401, the user
+        is logged in again and the request is retried once.
+
+        Identical concurrent GET requests of the same user share a single upstream request
+        when `coalesce_reads` is set.
+
+        Raises:
+            ToolError: If the response status code is not 2xx.
+        """
+        partition = self._partition()
+
+        async def send() -> httpx.Response:
+            token = await self._get_element_token(user_id)
+            response = await self._send(
+                method, url, headers=self._element_headers(token), **kwargs)
+            if response.status_code == 401:
+                partition.element_tokens.invalidate(user_id)
+                token = await self._get_element_token(user_id)
+                response = await self._send(
+                    method, url, headers=self._element_headers(token), **kwargs)
+            self._raise_for_status(response)
+            return response
+
+        if method != "GET" or not self.coalesce_reads:
+            return await send()
+        return await self._coalesce(self._read_key(url, kwargs.get("params"), (partition.name, user_id)), send)
+
+    @staticmethod
+    def _read_key(url: str, params: Optional[Dict], subject) -> tuple:
+        params = tuple(sorted((name, str(value))
+                       for name, value in (params or {}).items()))
+        return (url, params, subject)
+
+    async def _coalesce(self, key: tuple, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        """
+        Sends a read request, or waits for the identical request already in flight and
+        shares its response.
+        """
+        if key in self._reads:
+            self.metrics.upstream_coalesced.inc(tool=_current_tool.get())
+        return await self._share(self._reads, key, send)
+
+    @staticmethod
+    def _element_headers(token: str) -> Dict[str, str]:
+        return {
+            "authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+        }
+
+    async def _get_element_token(self, user_id: str) -> str:
+        """
+        Returns an element bearer token for the user, logging in only when there is no
+        valid cached token. Concurrent calls for the same user share a single login.
+        """
+        partition = self._partition()
+        token = partition.element_tokens.get(user_id)
+        if token is not MISSING:
+            return token
+
+        return await self._share(partition.element_logins, (user_id,), lambda: self._login_as(user_id))
+
+    @staticmethod
+    async def _share(flights: Dict[tuple, asyncio.Future], key: tuple, start: Callable[[], Awaitable]):
+        """
+        Awaits the call in flight for the key, starting it if there is none, so that
+        concurrent callers share a single call and its outcome.
+        """
+        flight = flights.get(key)
+        if flight is None:
+            flight = asyncio.ensure_future(start())
+            flights[key] = flight
+
+            def on_done(future: asyncio.Future) -> None:
+                flights.pop(key, None)
+                if not future.cancelled():
+                    # Mark the exception as retrieved in case every waiter was cancelled.
+                    future.exception()
+
+            flight.add_done_callback(on_done)
+
+        # Shield the shared call so a cancelled caller does not cancel it for the others.
+        return await asyncio.shield(flight)
+
+    async def _login_as(self, user_id: str) -> str:
+        partition = self._partition()
+        login = await self._call_sdk(
+            "elements_login", lambda: self.permit.elements.login_as(user_id, partition.config.tenant))
+        token = login.element_bearer_token
+
+        expires_in = _jwt_expires_in(token)
+        ttl = (expires_in if expires_in is not None else self.element_token_ttl) \
+            - self.element_token_refresh_margin
+        if ttl > 0:
+            partition.element_tokens.set(user_id, token, ttl=ttl)
+        return token
+
+    @staticmethod
+    def _raise_for_status(response: httpx.Response) -> None:
+        if not 200 <= response.status_code < 300:
+            raise ToolError(
+                f"Request failed with status code {response.status_code}: {response.text}")
+
+    def _circuit_breaker(self, url: str) -> CircuitBreaker:
+        path = urlsplit(url).path
+        endpoint = next(
+            (name for name in UPSTREAM_ENDPOINTS if f"/{name}" in path), path)
+        return self._endpoint_breaker(endpoint)
+
+    def _endpoint_breaker(self, endpoint: str) -> CircuitBreaker:
+        circuit_breakers = self._partition().circuit_breakers
+        breaker = circuit_breakers.get(endpoint)
+        if breaker is None:
+            breaker = circuit_breakers[endpoint] = CircuitBreaker(
+                self.circuit_failure_threshold, self.circuit_reset_timeout)
+        return breaker
+
+    async def _send(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Sends a request through the shared HTTP client without checking the response status.
+
+        Requests are rate limited when `rate_limit` is set, fail fast while the endpoint's
+        circuit breaker is open, and are retried with jittered exponential backoff (or after
+        the `Retry-After` delay) according to the retry policy.
+
+        Raises:
+            ToolError: If the circuit breaker is open, or the request failed without a response.
+        """
+        breaker = self._circuit_breaker(url)
+        rate_limiter = self._partition().rate_limiter
+        tool = _current_tool.get()
+        attempt = 0
+        while True:
+            # The token is taken before the breaker is asked, so that a request cancelled
+            # while it waits for one never holds the half-open trial.
+            if rate_limiter is not None:
+                await rate_limiter.acquire()
+            if not breaker.allow():
+                self.metrics.upstream_rejections.inc(tool=tool)
+                raise ToolError(
+                    f"The Permit API is currently unavailable, please retry in {math.ceil(breaker.retry_in())} seconds.")
+
+            attempt += 1
+            try:
+                response = await self._send_once(method, url, **kwargs)
+            except httpx.TransportError as error:
+                breaker.record_failure()
+                delay = None
+                if self.retry_policy.should_retry_error(method, isinstance(error, httpx.ConnectError)):
+                    delay = self.retry_policy.delay(attempt)
+                if delay is None:
+                    raise ToolError(
+                        f"Request to the Permit API failed: {error!r}") from error
+            except BaseException:
+                # Cancelled, or failed without telling anything about the endpoint's health
+                # (e.g. too many redirects or an undecodable body).
+                breaker.release()
+                raise
+            else:
+                if response.status_code >= 500:
+                    breaker.record_failure()
+                elif response.status_code == 429:
+                    # Throttling is left to the retry policy and Retry-After, not the breaker.
+                    breaker.release()
+                else:
+                    breaker.record_success()
+                delay = None
+                if self.retry_policy.should_retry_status(method, response.status_code):
+                    delay = self.retry_policy.delay(
+                        attempt, parse_retry_after(response.headers.get("retry-after")))
+                if delay is None:
+                    return response
+                await response.aclose()
+
+            self.metrics.upstream_retries.inc(tool=tool, method=method)
+            logger.warning(
+                f"Retrying {method} request to the Permit API in {delay:.2f}s (attempt {attempt + 1})")
+            await asyncio.sleep(delay)
+
+    async def _call_sdk(self, endpoint: str, call: Callable[[], Awaitable]):
+        """
+        Calls the Permit SDK through the rate limiter and the circuit breaker of `endpoint`,
+        like requests sent with `_send`. SDK calls are not retried.
+
+        Raises:
+            ToolError: If the circuit breaker is open.
+        """
+        breaker = self._endpoint_breaker(endpoint)
+        rate_limiter = self._partition().rate_limiter
+        if rate_limiter is not None:
+            await rate_limiter.acquire()
+        if not breaker.allow():
+            self.metrics.upstream_rejections.inc(tool=_current_tool.get())
+            raise ToolError(
+                f"The Permit API is currently unavailable, please retry in {math.ceil(breaker.retry_in())} seconds.")
+        try:
+            result = await call()
+        except BaseException as error:
+            outcome = self._sdk_error_outcome(error)
+            if outcome == "failure":
+                breaker.record_failure()
+            elif outcome == "success":
+                breaker.record_success()
+            else:
+                breaker.release()
+            raise
+        breaker.record_success()
+        return result
+
+    @staticmethod
+    def _sdk_error_outcome(error: BaseException) -> str:
+        """
+        Classifies an SDK error for the circuit breaker: "failure" when Permit is unreachable
+        or failing, "success" when it answered (e.g. a 404), else "unknown".
+        """
+        # The SDK is already imported when one of its calls failed.
+        from permit.exceptions import PermitApiError, PermitConnectionError
+
+        if isinstance(error, (PermitConnectionError, asyncio.TimeoutError)):
+            return "failure"
+        if isinstance(error, PermitApiError):
+            try:
+                status_code = error.status_code
+            except Exception:
+                return "unknown"
+            if status_code >= 500:
+                return "failure"
+            # Throttling is not a failure of the endpoint, as in `_send`.
+            return "unknown" if status_code == 429 else "success"
+        return "unknown"
+
+    async def _send_once(self, method: str, url: str, **kwargs) -> httpx.Response:
+        client = self._get_client()
+        stats = self._http_stats
+        stats["requests_total"] += 1
+        stats["requests_in_flight"] += 1
+        stats["requests_in_flight_peak"] = max(
+            stats["requests_in_flight_peak"], stats["requests_in_flight"])
+        tool = _current_tool.get()
+        status_code = "error"
+        start = time.perf_counter()
+        call_stats = _call_stats.get()
+        try:
+            response = await client.request(method, url, **kwargs)
+            status_code = response.status_code
+        finally:
+            stats["requests_in_flight"] -= 1
+            if call_stats is not None:
+                call_stats["upstream_calls"] += 1
+                call_stats["upstream_status"] = status_code
+            self.metrics.upstream_duration.observe(
+                time.perf_counter() - start, tool=tool, method=method)
+            self.metrics.upstream_responses.inc(
+                tool=tool, status_code=status_code)
+        return response
+
+    async def _attach_requesting_users(self, items: List[Dict]) -> None:
+        """
+        Attaches the requesting user to each item in place.
+
+        Each distinct user is looked up once, from the user cache when enabled, and the
+        remaining lookups run concurrently, bounded by `user_lookup_concurrency`. If a lookup
+        fails, the affected items keep only their `requesting_user_id`.
+        """
+        user_ids = list(dict.fromkeys(
+            item["requesting_user_id"] for item in items if item.get("requesting_user_id")))
+        if not user_ids:
+            return
+
+        start = time.perf_counter()
+        try:
+            await self._resolve_requesting_users(items, user_ids)
+        finally:
+            self.metrics.enrichment_duration.observe(
+                time.perf_counter() - start, tool=_current_tool.get())
+
+    async def _resolve_requesting_users(self, items: List[Dict], user_ids: List[str]) -> None:
+        partition = self._partition()
+        user_cache = partition.user_cache
+        users = {}
+        if user_cache is not None:
+            missing_ids = []
+            for user_id in user_ids:
+                user = user_cache.get(user_id)
+                if user is MISSING:
+                    missing_ids.append(user_id)
+                elif user is not None:
+                    users[user_id] = user
+            user_ids = missing_ids
+
+        semaphore = asyncio.Semaphore(self.user_lookup_concurrency)
+
+        async def lookup(user_id: str):
+            async with semaphore:
+                return _plain_user(await self._call_sdk(
+                    "users", lambda: self.permit.api.users.get_by_id(user_id)))
+
+        async def get_user(user_id: str):
+            if not self.coalesce_reads:
+                return await lookup(user_id)
+            return await self._share(self._user_lookups, (partition.name, user_id), lambda: lookup(user_id))
+
+        results = await asyncio.gather(
+            *(get_user(user_id) for user_id in user_ids), return_exceptions=True)
+
+        for user_id, result in zip(user_ids, results):
+            if isinstance(result, Exception):
+                logger.warning(
+                    f"Failed to fetch requesting user {user_id}: {result}")
+                if user_cache is not None and self._is_not_found(result):
+                    user_cache.set(user_id, None)
+            else:
+                users[user_id] = result
+                if user_cache is not None:
+                    user_cache.set(user_id, result)
+
+        for item in items:
+            user = users.get(item.get("requesting_user_id"))
+            if user is not None:
+                item["requesting_user"] = user
+
+    @staticmethod
+    def _is_not_found(error: Exception) -> bool:
+        # The SDK is already imported when one of its calls failed.
+        from permit.exceptions import PermitApiError
+
+        return isinstance(error, PermitApiError) and error.status_code == 404
+
+    @staticmethod
+    def _page_items(data: Union[List, Dict]) -> Tuple[List[Dict], Optional[int]]:
+        """
+        Returns the items of a page and the total number of items, if the page reports it.
+        """
+        if isinstance(data, list):
+            return data, None
+        return data.get("data", []), data.get("total_count")
+
+    async def _fetch_all_pages(
+        self,
+        fetch_page: Callable[[int, int], Awaitable[Tuple[List[Dict], Optional[int]]]],
+        per_page: int,
+        max_items: Optional[int] = None,
+    ) -> List[Dict]:
+        """
+        Fetches every page of a list endpoint and returns the merged items in page order,
+        capped at `max_items` (default: `fetch_all_max_items`).
+
+        The first page is read on its own to learn the total number of items, then the
+        remaining pages are fetched concurrently, bounded by `page_fetch_concurrency`.
+        When the endpoint does not report a total, pages are read one by one until a
+        short page is returned.
+
+        Args:
+            fetch_page: Coroutine function taking a page number and page size, and returning
+                the page items and the total number of items (or None).
+            per_page: Page size to request (at most 100).
+            max_items: Maximum number of items to return.
+        """
+        max_items = max_items if max_items else self.fetch_all_max_items
+        per_page = max(1, min(per_page, 100, max_items))
+
+        items, total_count = await fetch_page(1, per_page)
+        items = list(items)
+        if total_count is not None:
+            last_page = math.ceil(min(total_count, max_items) / per_page)
+            semaphore = asyncio.Semaphore(self.page_fetch_concurrency)
+
+            async def get_page(page: int) -> List[Dict]:
+                async with semaphore:
+                    page_items, _ = await fetch_page(page, per_page)
+                    return page_items
+
+            pages = await asyncio.gather(
+                *(get_page(page) for page in range(2, last_page + 1)))
+            for page_items in pages:
+                items.extend(page_items)
+        else:
+            page, page_items = 1, items
+            while len(page_items) == per_page and len(items) < max_items:
+                page += 1
+                page_items, _ = await fetch_page(page, per_page)
+                items.extend(page_items)
+
+        if len(items) > max_items:
+            logger.warning(
+                f"Truncated fetch_all results to {max_items} of {total_count or 'more than ' + str(max_items)} items")
+            del items[max_items:]
+        return items
+
+    async def _get_resource_instances_page(
+        self, page: int, per_page: int, include_total_count: bool = False
+    ) -> Union[List, Dict]:
+        config = self._config()
+        params = {k: v for k, v in {
+            "tenant": config.tenant,
+            "resource": config.resource_key,
+            "page": page,
+            "per_page": per_page,
+            "include_total_count": "true" if include_total_count else None,
+        }.items() if v is not None}
+
+        response = await self._request("GET", config.resource_instances_url, headers=config.headers, params=params)
+        return codec.loads(response.content)
+
+    async def _fetch_resource_instances_page(self, page: int, per_page: int) -> Tuple[List[Dict], Optional[int]]:
+        return self._page_items(
+            await self._get_resource_instances_page(page, per_page, include_total_count=True))
+
+    async def _load_resource_instances(self) -> List[Dict]:
+        return await self._fetch_all_pages(
+            self._fetch_resource_instances_page, 100, max_items=self.catalog_max_items)
+
+    async def _fetch_access_requests_page(
+        self,
+        user_id: str,
+        page: int,
+        per_page: int,
+        status: Optional[str] = None,
+        role: Optional[str] = None,
+        resource_instance: Optional[Union[str, int]] = None,
+    ) -> Tuple[List[Dict], Optional[int]]:
+        config = self._config()
+        params = {k: v for k, v in {
+            "status": status,
+            "role": role,
+            "resource": config.resource_key,
+            "resource_instance_id": resource_instance,
+            "page": page,
+            "per_page": per_page,
+        }.items() if v is not None}
+
+        response = await self._request("GET", config.access_requests_url(user_id), headers=config.headers, params=params)
+        return self._page_items(codec.loads(response.content))
+
+    async def _fetch_operation_approvals_page(
+        self,
+        user_id: str,
+        page: int,
+        per_page: int,
+        status: Optional[str] = None,
+        resource_instance: Optional[Union[str, int]] = None,
+    ) -> Tuple[List[Dict], Optional[int]]:
+        config = self._config()
+        params = {
+            "element_id": config.operation_elements_config_id,
+            "resource": config.resource_key
+        }
+        if status:
+            params["status"] = status
+        if resource_instance:
+            params["resource_instance"] = resource_instance
+        if page:
+            params["page"] = page
+        if per_page:
+            params["per_page"] = per_page
+
+        response = await self._element_request(user_id, "GET", config.operation_approvals_url, params=params)
+        return self._page_items(codec.loads(response.content))
+
+    async def _list_requests(
+        self,
+        kind: str,
+        user_id: str,
+        page: Optional[int],
+        per_page: Optional[int],
+        fetch_all: bool,
+        **filters,
+    ) -> List[Dict]:
+        """
+        Lists access requests or operation approvals, from the request mirror when it is
+        enabled and fresh for the user, else from the Permit API.
+        """
+        fetch = self._fetch_access_requests_page if kind == ACCESS_REQUESTS_KIND \
+            else self._fetch_operation_approvals_page
+        fetch_page = functools.partial(fetch, user_id, **filters)
+
+        # The Permit API matches roles and resource instances by key or ID, while a request
+        # only holds one of them: listings filtered on them are left to the Permit API.
+        if self.mirror is not None and not filters.get("role") and not filters.get("resource_instance"):
+            if fetch_all:
+                offset, limit = 0, self.fetch_all_max_items
+            else:
+                limit = per_page or 30
+                offset = ((page or 1) - 1) * limit
+            items = await self.mirror.query(
+                (self._partition().name, kind, user_id), filters.get("status"), offset=offset, limit=limit)
+            if items is not None:
+                return items
+
+        if fetch_all:
+            return await self._fetch_all_pages(fetch_page, per_page or 100)
+        items, _ = await fetch_page(page, per_page)
+        return items
+
+    async def _sync_mirror_scope(self, scope: Tuple[str, str, str]) -> List[Dict]:
+        """
+        Fetches every request listed by a user, to refresh the request mirror.
+        """
+        config, kind, user_id = scope
+        fetch = self._fetch_access_requests_page if kind == ACCESS_REQUESTS_KIND \
+            else self._fetch_operation_approvals_page
+        partition_token = _current_partition.set(self._partitions[config])
+        tool_token = _current_tool.set("mirror_sync")
+        try:
+            return await self._fetch_all_pages(
+                functools.partial(fetch, user_id), 100, max_items=self.mirror_max_items)
+        finally:
+            _current_tool.reset(tool_token)
+            _current_partition.reset(partition_token)
+
+    def _mark_mirror_stale(self, kind: str) -> None:
+        config = self._partition().name
+        if self.mirror is not None:
+            self.mirror.mark_stale(config, kind)
+        for (poller_config, poller_kind, _), poller in self._pollers.items():
+            if (poller_config, poller_kind) == (config, kind):
+                poller.wake()
+
+    def _pending_poller(self, kind: str, user_id: str) -> PendingPoller:
+        """
+        Returns the poller of the pending requests listed by a user, shared by every waiting session.
+        Pollers are dropped once they stop for lack of waiters.
+        """
+        partition = self._partition()
+        key = (partition.name, kind, user_id)
+        poller = self._pollers.get(key)
+        if poller is None:
+            async def fetch() -> List[Dict]:
+                partition_token = _current_partition.set(partition)
+                tool_token = _current_tool.set("pending_poll")
+                try:
+                    return await self._list_requests(kind, user_id, None, None, True, status="pending")
+                finally:
+                    _current_tool.reset(tool_token)
+                    _current_partition.reset(partition_token)
+
+            def on_idle() -> None:
+                if self._pollers.get(key) is poller:
+                    del self._pollers[key]
+
+            poller = self._pollers[key] = PendingPoller(
+                fetch, interval=self.watch_poll_interval, on_idle=on_idle)
+        return poller
+
+    async def _review_access_request(
+        self, user_id: str, access_request_id: str, decision: str, reviewer_comment: Optional[str] = None
+    ) -> None:
+        config = self._config()
+        url = f"{config.access_requests_url(user_id)}/{access_request_id}/{decision}"
+
+        payload = {}
+        if reviewer_comment:
+            payload["reviewer_comment"] = reviewer_comment
+
+        await self._request("PUT", url, json=payload, headers=config.headers)
+        self._mark_mirror_stale(ACCESS_REQUESTS_KIND)
+
+    async def _review_operation_approval(
+        self, user_id: str, operation_approval_id: str, decision: str, reviewer_comment: Optional[str] = None
+    ) -> None:
+        url = f"{self._config().operation_approvals_url}/{operation_approval_id}/{decision}"
+
+        payload = {}
+        if reviewer_comment:
+            payload["reviewer_comment"] = reviewer_comment
+
+        await self._element_request(user_id, "PUT", url, json=payload)
+        self._mark_mirror_stale(OPERATION_APPROVALS_KIND)
+
+    async def _review_many(
+        self,
+        review: Callable[[str, str, str, Optional[str]], Awaitable[None]],
+        user_id: str,
+        ids: List[str],
+        decision: str,
+        reviewer_comments: Optional[List[str]] = None,
+        reviewer_comment: Optional[str] = None,
+    ) -> Dict:
+        """
+        Reviews several requests concurrently, bounded by `bulk_concurrency`, and returns a
+        per-item report. A failed item does not stop the others.
+
+        Args:
+            review: Coroutine function reviewing a single request.
+            user_id: The reviewer.
+            ids: The IDs of the requests to review.
+            decision: "approve" or "deny".
+            reviewer_comments: Optional comments aligned with `ids`. Empty entries fall back to `reviewer_comment`.
+            reviewer_comment: Optional comment for every request without its own comment.
+        """
+        comments = list(reviewer_comments or [])
+        if len(comments) > len(ids):
+            raise ToolError(
+                "reviewer_comments must not have more entries than there are IDs.")
+        # Comments are paired with their IDs before repeated IDs are dropped.
+        pairs = list(dict.fromkeys(
+            (item_id, (comments[index] if index < len(comments) else None) or reviewer_comment)
+            for index, item_id in enumerate(ids)))
+        if not pairs:
+            raise ToolError("At least one ID is required.")
+        if len(pairs) > self.bulk_max_items:
+            raise ToolError(
+                f"At most {self.bulk_max_items} IDs can be reviewed at once, got {len(pairs)}.")
+        repeated = [item_id for item_id, count in Counter(item_id for item_id, _ in pairs).items() if count > 1]
+        if repeated:
+            raise ToolError(
+                f"IDs listed more than once must have the same comment: {', '.join(repeated)}.")
+
+        semaphore = asyncio.Semaphore(self.bulk_concurrency)
+        status = "approved" if decision == "approve" else "denied"
+
+        async def review_one(item_id: str, comment: Optional[str]) -> Dict:
+            async with semaphore:
+                try:
+                    await review(user_id, item_id, decision, comment)
+                except Exception as error:
+                    return {"id": item_id, "status": "failed", "error": str(error)}
+            return {"id": item_id, "status": status}
+
+        results = await asyncio.gather(
+            *(review_one(item_id, comment) for item_id, comment in pairs))
+        failed = sum(1 for result in results if result["status"] == "failed")
+        return {
+            "succeeded": len(results) - failed,
+            "failed": failed,
+            "results": results,
+        }
+
+    async def warm_up(self, users: Optional[List[str]] = None) -> Dict[str, float]:
+        """
+        Pays the cold costs of the first tool calls ahead of time: imports the Permit SDK, opens
+        the pooled connection and loads the resource instance catalog of every configuration,
+        and logs in (and, with the user cache, looks up) the frequent users.
+
+        Failed steps are logged and skipped. Returns the duration in seconds of each step,
+        e.g. "sdk", "default.catalog", "default.users" and "total".
+
+        Args:
+            users: IDs of the users to warm up (default: `warm_up_users`).
+        """
+        users = list(users if users is not None else self.warm_up_users)
+        timings: Dict[str, float] = {}
+        start = time.perf_counter()
+
+        async def step(name: str, run: Callable[[], Awaitable], partition: Optional[_Partition] = None) -> None:
+            partition_token = _current_partition.set(partition) if partition is not None else None
+            tool_token = _current_tool.set("warm_up")
+            step_start = time.perf_counter()
+            try:
+                await run()
+            except Exception as error:
+                logger.warning(f"Warm-up step {name} failed: {error}")
+            finally:
+                timings[name] = round(time.perf_counter() - step_start, 4)
+                _current_tool.reset(tool_token)
+                if partition_token is not None:
+                    _current_partition.reset(partition_token)
+
+        async def import_sdk() -> None:
+            partitions = [partition for partition in self._partitions.values() if partition.permit is None]
+            if partitions:
+                # Importing the SDK takes hundreds of milliseconds, keep it off the event loop.
+                await asyncio.to_thread(importlib.import_module, "permit")
+            for partition in partitions:
+                self._partition_permit(partition)
+
+        async def warm_up_users(partition: _Partition) -> None:
+            await sdk
+            await asyncio.gather(*(self._get_element_token(user_id) for user_id in users))
+            if partition.user_cache is not None:
+                await self._resolve_requesting_users([], users)
+
+        sdk = asyncio.ensure_future(step("sdk", import_sdk))
+        steps = [sdk]
+        for partition in self._partitions.values():
+            steps.append(step(f"{partition.name}.catalog", partition.catalog.ensure_loaded, partition))
+            if users:
+                steps.append(step(f"{partition.name}.users", functools.partial(warm_up_users, partition), partition))
+        await asyncio.gather(*steps)
+
+        timings["total"] = round(time.perf_counter() - start, 4)
+        self.warm_up_timings = timings
+        logger.info("Warm-up done in %.2fs: %s", timings["total"],
+                    ", ".join(f"{name}={seconds:.2f}s" for name, seconds in timings.items() if name != "total"))
+        return timings
+
+    def start_warm_up(self, users: Optional[List[str]] = None) -> asyncio.Task:
+        """
+        Runs `warm_up` in the background, e.g. while the MCP session initializes.
+        Tool calls made meanwhile share the loads already in flight.
+        """
+        if self._warm_up_task is None or self._warm_up_task.done():
+            self._warm_up_task = asyncio.create_task(self.warm_up(users))
+        return self._warm_up_task
+
+    def invalidate_users(self, user_ids: Optional[List[str]] = None, config: Optional[str] = None) -> None:
+        """
+        Drops the given users from the user cache, or the whole cache when no IDs are given.
+        Call this after updating users in Permit so the next listing fetches them again.
+
+        Args:
+            user_ids: The IDs of the users to drop (default: every user).
+            config: Name of the configuration whose cache is cleared (default: every configuration).
+        """
+        partitions = [self._partitions[config]] if config else self._partitions.values()
+        for partition in partitions:
+            if partition.user_cache is None:
+                continue
+            if user_ids is None:
+                partition.user_cache.invalidate()
+            else:
+                for user_id in user_ids:
+                    partition.user_cache.invalidate(user_id)
+
+    def metrics_text(self) -> str:
+        """
+        Returns a snapshot of the server metrics in the Prometheus text exposition format.
+        """
+        pool = self.pool_stats()
+        gauges = {
+            "permit_mcp_http_requests_in_flight": (
+                "HTTP requests to the Permit API currently in flight.", pool["requests_in_flight"]),
+            "permit_mcp_http_connections_open": (
+                "Open connections in the shared HTTP pool.", pool["connections_open"]),
+            "permit_mcp_http_connections_idle": (
+                "Idle connections in the shared HTTP pool.", pool["connections_idle"]),
+            "permit_mcp_resource_catalog_size": (
+                "Resource instances in the catalogs.", sum(len(partition.catalog) for partition in self._partitions.values())),
+        }
+        caches = [partition.user_cache.stats() for partition in self._partitions.values()
+                  if partition.user_cache is not None]
+        if caches:
+            gauges.update({
+                "permit_mcp_user_cache_size": ("Users in the user caches.", sum(cache["size"] for cache in caches)),
+                "permit_mcp_user_cache_hits": ("User cache hits.", sum(cache["hits"] for cache in caches)),
+                "permit_mcp_user_cache_misses": ("User cache misses.", sum(cache["misses"] for cache in caches)),
+            })
+        if "total" in self.warm_up_timings:
+            gauges["permit_mcp_warm_up_seconds"] = (
+                "Duration of the last warm-up.", self.warm_up_timings["total"])
+        gauges["permit_mcp_pending_pollers_running"] = (
+            "Pollers of pending requests currently running.", sum(1 for poller in self._pollers.values() if poller.running))
+        if self.mirror is not None:
+            gauges.update({
+                "permit_mcp_mirror_hits": ("Listings served from the request mirror.", self.mirror.stats["hits"]),
+                "permit_mcp_mirror_misses": ("Listings served by the Permit API because the mirror was stale.", self.mirror.stats["misses"]),
+                "permit_mcp_mirror_syncs": ("Syncs of the request mirror.", self.mirror.stats["syncs"]),
+                "permit_mcp_mirror_sync_errors": ("Failed syncs of the request mirror.", self.mirror.stats["sync_errors"]),
+            })
+        return self.metrics.render(gauges)
+
+    def pool_stats(self) -> Dict:
+        """
+        Returns usage statistics of the shared HTTP clients and their connection pools,
+        summed over the configurations. The connection limits apply per configuration.
+        """
+        stats = dict(self._http_stats)
+        stats["max_connections"] = self.http_limits.max_connections
+        stats["max_keepalive_connections"] = self.http_limits.max_keepalive_connections
+
+        connections = []
+        for partition in self._partitions.values():
+            if partition.client is not None and not partition.client.is_closed:
+                # httpx does not expose its pool publicly, so read it defensively.
+                transport = getattr(partition.client, "_transport", None)
+                pool = getattr(transport, "_pool", None)
+                connections.extend(getattr(pool, "connections", []))
+        stats["connections_open"] = len(connections)
+        stats["connections_idle"] = sum(
+            1 for connection in connections if connection.is_idle())
+        return stats
+
+    async def aclose(self) -> None:
+        """
+        Stops background tasks and closes the shared HTTP clients. Call this when the server shuts down.
+        """
+        if self._warm_up_task is not None and not self._warm_up_task.done():
+            self._warm_up_task.cancel()
+            await asyncio.gather(self._warm_up_task, return_exceptions=True)
+        for poller in list(self._pollers.values()):
+            await poller.stop()
+        if self.mirror is not None:
+            await self.mirror.close()
+        for partition in self._partitions.values():
+            await partition.catalog.stop()
+            if partition.client is not None:
+                await partition.client.aclose()
+                partition.client = None
+
+    async def __aenter__(self) -> "PermitServer":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    def _instrument(self, tool_name: str, func: Callable) -> Callable:
+        """
+        Wraps a tool to record its call count, outcome and latency, and to run it against
+        the selected configuration. With several configurations, the tool also takes an
+        optional `config` argument.
+        """
+        select_config = len(self._partitions) > 1 and tool_name != USE_CONFIGURATION_TOOL
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            config = kwargs.pop("config", None) if select_config else None
+            token = _current_tool.set(tool_name)
+            call_stats = {"upstream_calls": 0, "upstream_status": None}
+            stats_token = _call_stats.set(call_stats)
+            partition_token = None
+            partition = None
+            status = "error"
+            result = None
+            start = time.perf_counter()
+            try:
+                partition = self._select_partition(config)
+                partition_token = _current_partition.set(partition)
+                result = await func(*args, **kwargs)
+                status = "ok"
+                self.payload_logger.log(tool_name, result)
+                return result
+            finally:
+                elapsed = time.perf_counter() - start
+                self.metrics.tool_duration.observe(elapsed, tool=tool_name)
+                self.metrics.tool_calls.inc(tool=tool_name, status=status)
+                if call_logger.isEnabledFor(logging.INFO):
+                    call_logger.info("%s %s in %.1fms", tool_name, status, elapsed * 1000, extra={
+                        "tool": tool_name,
+                        "config": partition.name if partition is not None and len(self._partitions) > 1 else None,
+                        "status": status,
+                        "latency_ms": round(elapsed * 1000, 2),
+                        "items": item_count(result),
+                        **call_stats,
+                    })
+                if partition_token is not None:
+                    _current_partition.reset(partition_token)
+                _call_stats.reset(stats_token)
+                _current_tool.reset(token)
+
+        if select_config:
+            names = tuple(self._partitions)
+            signature = inspect.signature(func)
+            parameter = inspect.Parameter(
+                "config", inspect.Parameter.KEYWORD_ONLY, default=None, annotation=Optional[Literal[names]])
+            wrapper.__signature__ = signature.replace(
+                parameters=[*signature.parameters.values(), parameter])
+            wrapper.__annotations__ = {
+                **func.__annotations__, "config": parameter.annotation}
+            wrapper.__doc__ = (func.__doc__ or "").rstrip() + (
+                f"\n\n            The optional `config` argument selects the Permit configuration ({', '.join(names)}). "
+                f"It defaults to the configuration selected for the session with {USE_CONFIGURATION_TOOL}, "
+                f"or {self.default_config!r}.\n")
+        return wrapper
+
     def _register_tool(self, tool_name: str, func: Callable) -> None:
         """
-        Helper that conditionally wraps a tool with the @mcp.tool() decorator.
+        Helper that instruments a tool and conditionally wraps it with the @mcp.tool() decorator.
         """
+        func = self._instrument(tool_name, func)
         if tool_name not in self.exclude_tools:
             func = self.mcp.tool()(func)
         setattr(self, tool_name, func)
 
     def register_tools(self):
 
-        async def list_resource_instances(page: int = 1, per_page: int = 100):
+        async def list_resource_instances(
+            page: int = 1,
+            per_page: int = 100,
+            fetch_all: bool = False,
+            fields: Optional[List[str]] = None,
+        ):
             """
                 Lists resource instances along with their ID and key which can be used as a parameter for tools that required it. 
                 It can be used to verify the existeance of a resource instance.
@@ -59,32 +1298,44 @@ class PermitServer:
                 Args:
                     page: Optional page number of the results to fetch, starting at page 1.
                     per_page: Optional number of results per page (maximum of 100).
+                    fetch_all: Optional. Set to true to fetch every page at once instead of a single page (up to a server-defined limit). `page` is ignored.
+                    fields: Optional fields to return for each resource instance, as names or dotted paths (e.g., "attributes.name"). Defaults to id, key, resource, tenant and attributes. Pass ["*"] to return every field.
             """
+            fields = RESOURCE_INSTANCES.resolve(fields)
+            if fetch_all:
+                resource_instances = await self._fetch_all_pages(self._fetch_resource_instances_page, per_page)
+                return RESOURCE_INSTANCES.apply(resource_instances, fields)
 
-            url = f"https://api.permit.io/v2/facts/{PROJECT_ID}/{ENV_ID}/resource_instances"
-
-            params = {k: v for k, v in {
-                "tenant": TENANT,
-                "resource": RESOURCE_KEY,
-                "page": page,
-                "per_page": per_page,
-            }.items() if v is not None}
+            data = await self._get_resource_instances_page(page, per_page)
+            if isinstance(data, dict) and fields is not None:
+                return {**data, "data": RESOURCE_INSTANCES.apply(data.get("data", []), fields)}
+            return RESOURCE_INSTANCES.apply(data, fields) if isinstance(data, list) else data
 
-            headers = {"authorization": f"Bearer {PERMIT_API_KEY}",
-                       "Content-Type": "application/json"}
+        self._register_tool("list_resource_instances",
+                            list_resource_instances)
 
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, headers=headers, params=params)
-                if 200 <= response.status_code < 300:
-                    resources_instances = response.json()
-                    return resources_instances
+        async def search_resource_instances(
+            query: str,
+            attribute: Optional[str] = None,
+            limit: int = 20,
+            fields: Optional[List[str]] = None,
+        ) -> List[Dict]:
+            """
+            Searches resource instances by ID, key or attribute value (for example a name), returning their ID and key which can be used as a parameter for tools that required it.
+            Prefer this tool over listing every resource instance when looking for specific ones.
 
-                else:
-                    raise ToolError(
-                        f"Request failed with status code {response.status_code}: {response.text}")
+            Args:
+                query: The ID, key or attribute value to search for. Values containing all the words of the query match, ignoring case.
+                attribute: Optional name of the attribute to search in (e.g., "name"). Searches the ID, key and every attribute when omitted.
+                limit: Optional maximum number of results (default: 20).
+                fields: Optional fields to return for each resource instance, as names or dotted paths (e.g., "attributes.name"). Defaults to id, key, resource, tenant and attributes. Pass ["*"] to return every field.
+            """
+            await self.catalog.ensure_loaded()
+            return RESOURCE_INSTANCES.apply(
+                self.catalog.search(query, attribute=attribute, limit=limit), RESOURCE_INSTANCES.resolve(fields))
 
-        self._register_tool("list_resource_instances",
-                            list_resource_instances)
+        self._register_tool("search_resource_instances",
+                            search_resource_instances)
 
         async def create_access_request(user_id: str,  role: str, reason: str, resource_instance: Optional[Union[str, int]] = None) -> str:
             """
@@ -97,25 +1348,18 @@ class PermitServer:
                 reason: The reason for the access request.
             """
 
-            url = f"https://api.permit.io/v2/facts/{PROJECT_ID}/{ENV_ID}/access_requests/{ACCESS_ELEMENTS_CONFIG_ID}/user/{user_id}/tenant/{TENANT}"
+            config = self._config()
             access_request_details = {
-                "tenant": TENANT, "resource": RESOURCE_KEY, "role": role}
+                "tenant": config.tenant, "resource": config.resource_key, "role": role}
             if resource_instance is not None:
                 access_request_details["resource_instance"] = resource_instance
 
             payload = {
                 "access_request_details": access_request_details, "reason": reason}
 
-            headers = {"authorization": f"Bearer {PERMIT_API_KEY}",
-                       "Content-Type": "application/json"}
-
-            async with httpx.AsyncClient() as client:
-                response = await client.post(url, json=payload, headers=headers)
-                if 200 <= response.status_code < 300:
-                    return "Your request has been successfully sent"
-                else:
-                    raise ToolError(
-                        f"Request failed with status code {response.status_code}: {response.text}")
+            await self._request("POST", config.access_requests_url(user_id), json=payload, headers=config.headers)
+            self._mark_mirror_stale(ACCESS_REQUESTS_KIND)
+            return "Your request has been successfully sent"
 
         self._register_tool("create_access_request", create_access_request)
 
@@ -126,6 +1370,8 @@ class PermitServer:
             resource_instance: Optional[Union[str, int]] = None,
             page: Optional[int] = 1,
             per_page: Optional[int] = 30,
+            fetch_all: bool = False,
+            fields: Optional[List[str]] = None,
         ) -> List[Dict]:
             """
             List access requests.
@@ -137,36 +1383,16 @@ class PermitServer:
                 resource_instance: Filter by resource instance key or ID. This parameter is required for ReBAC authorization.
                 page: Page number of the results to fetch (default: 1).
                 per_page: The number of results per page (max 100, default: 30).
+                fetch_all: Optional. Set to true to fetch every page at once instead of a single page (up to a server-defined limit). `page` is ignored.
+                fields: Optional fields to return for each access request, as names, dotted paths (e.g., "requesting_user.email") or "role", "resource_instance" and "requester" (the requesting user's name). Defaults to id, status, role, resource_instance, reason, requesting_user_id, requester and created_at. Pass ["*"] to return every field.
             """
-            url = f"https://api.permit.io/v2/facts/{PROJECT_ID}/{ENV_ID}/access_requests/{ACCESS_ELEMENTS_CONFIG_ID}/user/{user_id}/tenant/{TENANT}"
-            headers = {
-                "authorization": f"Bearer {PERMIT_API_KEY}",
-                "Content-Type": "application/json",
-            }
-
-            params = {k: v for k, v in {
-                "status": status,
-                "role": role,
-                "resource": RESOURCE_KEY,
-                "resource_instance_id": resource_instance,
-                "page": page,
-                "per_page": per_page,
-            }.items() if v is not None}
-
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, headers=headers, params=params)
-                if 200 <= response.status_code < 300:
-                    access_requests = response.json().get("data", [])
-                    for item in access_requests:
-                        requesting_user_id = item.get("requesting_user_id")
-                        if requesting_user_id:
-                            user = await self.permit.api.users.get_by_id(requesting_user_id)
-                            item["requesting_user"] = user
-
-                    return access_requests
-                else:
-                    raise ToolError(
-                        f"Request failed with status code {response.status_code}: {response.text}")
+            access_requests = await self._list_requests(
+                ACCESS_REQUESTS_KIND, user_id, page, per_page, fetch_all,
+                status=status, role=role, resource_instance=resource_instance)
+            fields = ACCESS_REQUESTS.resolve(fields)
+            if ACCESS_REQUESTS.needs_requesting_user(fields):
+                await self._attach_requesting_users(access_requests)
+            return ACCESS_REQUESTS.apply(access_requests, fields)
 
         self._register_tool("list_access_requests", list_access_requests)
 
@@ -179,24 +1405,8 @@ class PermitServer:
                 access_request_id: The ID of the access request to approve, which can be obtained by first listing access requests.
                 reviewer_comment: Optinoal comment from the reviewer.
             """
-            url = f"https://api.permit.io/v2/facts/{PROJECT_ID}/{ENV_ID}/access_requests/{ACCESS_ELEMENTS_CONFIG_ID}/user/{user_id}/tenant/{TENANT}/{access_request_id}/approve"
-
-            payload = {}
-
-            if reviewer_comment:
-                payload["reviewer_comment"] = reviewer_comment
-
-            headers = {
-                "authorization": f"Bearer {PERMIT_API_KEY}",
-                "Content-Type": "application/json",
-            }
-            async with httpx.AsyncClient() as client:
-                response = await client.put(url, json=payload, headers=headers)
-                if 200 <= response.status_code < 300:
-                    return "Access request approved successfully."
-                else:
-                    raise ToolError(
-                        f"Request failed with status code {response.status_code}: {response.text}")
+            await self._review_access_request(user_id, access_request_id, "approve", reviewer_comment)
+            return "Access request approved successfully."
 
         self._register_tool("approve_access_request", approve_access_request)
 
@@ -209,25 +1419,54 @@ class PermitServer:
                 access_request_id: The ID or URL-friendly key of the access request to deny, which can be obtained by first listing access requests.
                 reviewer_comment: Optional comment from the reviewer.
             """
-            url = f"https://api.permit.io/v2/facts/{PROJECT_ID}/{ENV_ID}/access_requests/{ACCESS_ELEMENTS_CONFIG_ID}/user/{user_id}/tenant/{TENANT}/{access_request_id}/deny"
+            await self._review_access_request(user_id, access_request_id, "deny", reviewer_comment)
+            return "Access request denied successfully."
 
-            payload = {}
-            if reviewer_comment:
-                payload["reviewer_comment"] = reviewer_comment
+        self._register_tool("deny_access_request", deny_access_request)
 
-            headers = {
-                "authorization": f"Bearer {PERMIT_API_KEY}",
-                "Content-Type": "application/json",
-            }
-            async with httpx.AsyncClient() as client:
-                response = await client.put(url, json=payload, headers=headers)
-                if response.status_code >= 200 and response.status_code < 300:
-                    return "Access request denied successfully."
-                else:
-                    raise ToolError(
-                        f"Request failed with status code {response.status_code}: {response.text}")
+        async def bulk_approve_access_requests(
+            user_id: str,
+            access_request_ids: List[str],
+            reviewer_comments: Optional[List[str]] = None,
+            reviewer_comment: Optional[str] = None,
+        ) -> Dict:
+            """
+            Approve several access requests at once. Prefer this tool over approving requests one by one.
+            Returns a report with the outcome of each request.
 
-        self._register_tool("deny_access_request", deny_access_request)
+            Args:
+                user_id: The ID or URL-friendly key of the user approving the requests.
+                access_request_ids: The IDs of the access requests to approve, which can be obtained by first listing access requests.
+                reviewer_comments: Optional comments from the reviewer, one per access request in the same order as access_request_ids. Use an empty string for no comment.
+                reviewer_comment: Optional comment from the reviewer for every access request without its own comment.
+            """
+            return await self._review_many(
+                self._review_access_request, user_id, access_request_ids, "approve", reviewer_comments, reviewer_comment)
+
+        self._register_tool("bulk_approve_access_requests",
+                            bulk_approve_access_requests)
+
+        async def bulk_deny_access_requests(
+            user_id: str,
+            access_request_ids: List[str],
+            reviewer_comments: Optional[List[str]] = None,
+            reviewer_comment: Optional[str] = None,
+        ) -> Dict:
+            """
+            Deny several access requests at once. Prefer this tool over denying requests one by one.
+            Returns a report with the outcome of each request.
+
+            Args:
+                user_id: The ID or URL-friendly key of the user denying the requests.
+                access_request_ids: The IDs of the access requests to deny, which can be obtained by first listing access requests.
+                reviewer_comments: Optional comments from the reviewer, one per access request in the same order as access_request_ids. Use an empty string for no comment.
+                reviewer_comment: Optional comment from the reviewer for every access request without its own comment.
+            """
+            return await self._review_many(
+                self._review_access_request, user_id, access_request_ids, "deny", reviewer_comments, reviewer_comment)
+
+        self._register_tool("bulk_deny_access_requests",
+                            bulk_deny_access_requests)
 
         # Operation Approval Tools
         async def create_operation_approval(user_id: str, reason: str, resource_instance: Optional[Union[str, int]] = None) -> str:
@@ -239,12 +1478,10 @@ class PermitServer:
                 resource_instance: The specific instance of the resource. This parameter is required for ReBAC authorization.
                 reason: The reason for the approval request.
             """
-            login = await self.permit.elements.login_as(user_id, TENANT)
-            url = f"https://api.permit.io/v2/elements/{PROJECT_ID}/{ENV_ID}/config/{OPERATION_ELEMENTS_CONFIG_ID}/operation_approval"
-
+            config = self._config()
             access_request_details = {
-                "tenant": TENANT,
-                "resource": RESOURCE_KEY,
+                "tenant": config.tenant,
+                "resource": config.resource_key,
             }
             if resource_instance is not None:
                 access_request_details["resource_instance"] = resource_instance
@@ -253,18 +1490,9 @@ class PermitServer:
                 "access_request_details": access_request_details,
                 "reason": reason
             }
-            headers = {
-                "authorization": f"Bearer {login.element_bearer_token}",
-                "Content-Type": "application/json",
-            }
-
-            async with httpx.AsyncClient() as client:
-                response = await client.post(url, json=payload, headers=headers)
-                if response.status_code >= 200 and response.status_code < 300:
-                    return "Operation approval request created successfully."
-                else:
-                    raise ToolError(
-                        f"Request failed with status code {response.status_code}: {response.text}")
+            await self._element_request(user_id, "POST", config.operation_approvals_url, json=payload)
+            self._mark_mirror_stale(OPERATION_APPROVALS_KIND)
+            return "Operation approval request created successfully."
 
         self._register_tool("create_operation_approval",
                             create_operation_approval)
@@ -275,6 +1503,8 @@ class PermitServer:
             resource_instance: Optional[Union[str, int]] = None,
             page: Optional[int] = 1,
             per_page: Optional[int] = 30,
+            fetch_all: bool = False,
+            fields: Optional[List[str]] = None,
         ) -> List[Dict]:
             """
             List one-time operation approval requests.
@@ -285,43 +1515,16 @@ class PermitServer:
                 resource_instance: Filter by resource instance key or ID. This parameter is required for ReBAC authorization.
                 page: Page number of the results to fetch (default: 1).
                 per_page: The number of results per page (max 100, default: 30).
+                fetch_all: Optional. Set to true to fetch every page at once instead of a single page (up to a server-defined limit). `page` is ignored.
+                fields: Optional fields to return for each operation approval, as names, dotted paths (e.g., "requesting_user.email") or "resource_instance" and "requester" (the requesting user's name). Defaults to id, status, resource_instance, reason, requesting_user_id, requester and created_at. Pass ["*"] to return every field.
             """
-            login = await self.permit.elements.login_as(user_id, TENANT)
-            url = f"https://api.permit.io/v2/elements/{PROJECT_ID}/{ENV_ID}/config/{OPERATION_ELEMENTS_CONFIG_ID}/operation_approval"
-
-            headers = {
-                "authorization": f"Bearer {login.element_bearer_token}",
-                "Content-Type": "application/json",
-            }
-            params = {
-                "element_id": OPERATION_ELEMENTS_CONFIG_ID,
-                "resource": RESOURCE_KEY
-            }
-            if status:
-                params["status"] = status
-            if resource_instance:
-                params["resource_instance"] = resource_instance
-            if page:
-                params["page"] = page
-            if per_page:
-                params["per_page"] = per_page
-
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, headers=headers, params=params)
-                if response.status_code >= 200 and response.status_code < 300:
-                    string_data = response.content.decode('utf-8')
-                    data = json.loads(string_data)
-                    operation_approvals = data.get("data", [])
-                    logger.info(operation_approvals)
-                    for item in operation_approvals:
-                        requesting_user_id = item.get("requesting_user_id")
-                        if requesting_user_id:
-                            user = await self.permit.api.users.get_by_id(requesting_user_id)
-                            item["requesting_user"] = user
-                    return operation_approvals
-                else:
-                    raise ToolError(
-                        f"Request failed with status code {response.status_code}: {response.text}")
+            operation_approvals = await self._list_requests(
+                OPERATION_APPROVALS_KIND, user_id, page, per_page, fetch_all,
+                status=status, resource_instance=resource_instance)
+            fields = OPERATION_APPROVALS.resolve(fields)
+            if OPERATION_APPROVALS.needs_requesting_user(fields):
+                await self._attach_requesting_users(operation_approvals)
+            return OPERATION_APPROVALS.apply(operation_approvals, fields)
 
         self._register_tool("list_operation_approvals",
                             list_operation_approvals)
@@ -335,24 +1538,8 @@ class PermitServer:
                 operation_approval_id: The ID or URL-friendly key of the operation approval, which can be obtained by first listing operation approvals.
                 reviewer_comment: Optional comment from the reviewer.
             """
-            login = await self.permit.elements.login_as(user_id, TENANT)
-            url = f"https://api.permit.io/v2/elements/{PROJECT_ID}/{ENV_ID}/config/{OPERATION_ELEMENTS_CONFIG_ID}/operation_approval/{operation_approval_id}/approve"
-
-            payload = {}
-            if reviewer_comment:
-                payload["reviewer_comment"] = reviewer_comment
-
-            headers = {
-                "authorization": f"Bearer {login.element_bearer_token}",
-                "Content-Type": "application/json",
-            }
-            async with httpx.AsyncClient() as client:
-                response = await client.put(url, json=payload, headers=headers)
-                if response.status_code >= 200 and response.status_code < 300:
-                    return "Operation approval request approved successfully."
-                else:
-                    raise ToolError(
-                        f"Request failed with status code {response.status_code}: {response.text}")
+            await self._review_operation_approval(user_id, operation_approval_id, "approve", reviewer_comment)
+            return "Operation approval request approved successfully."
 
         self._register_tool("approve_operation_approval",
                             approve_operation_approval)
@@ -366,36 +1553,214 @@ class PermitServer:
                 operation_approval_id: The ID or URL-friendly key of the operation approval to deny, which can be obtained by first listing operation approvals.
                 reviewer_comment: Optional comment from the reviewer.
             """
-            login = await self.permit.elements.login_as(user_id, TENANT)
-            url = f"https://api.permit.io/v2/elements/{PROJECT_ID}/{ENV_ID}/config/{OPERATION_ELEMENTS_CONFIG_ID}/operation_approval/{operation_approval_id}/deny"
+            await self._review_operation_approval(user_id, operation_approval_id, "deny", reviewer_comment)
+            return "Operation approval request denied successfully."
 
-            payload = {}
-            if reviewer_comment:
-                payload["reviewer_comment"] = reviewer_comment
+        self._register_tool("deny_operation_approval", deny_operation_approval)
 
-            headers = {
-                "authorization": f"Bearer {login.element_bearer_token}",
-                "Content-Type": "application/json",
-            }
+        async def bulk_approve_operation_approvals(
+            user_id: str,
+            operation_approval_ids: List[str],
+            reviewer_comments: Optional[List[str]] = None,
+            reviewer_comment: Optional[str] = None,
+        ) -> Dict:
+            """
+            Approve several operation approval requests at once. Prefer this tool over approving requests one by one.
+            Returns a report with the outcome of each request.
 
-            async with httpx.AsyncClient() as client:
-                response = await client.put(url, json=payload, headers=headers)
-                if response.status_code >= 200 and response.status_code < 300:
-                    return "Operation approval request denied successfully."
-                else:
-                    raise ToolError(
-                        f"Request failed with status code {response.status_code}: {response.text}")
+            Args:
+                user_id: The ID or URL-friendly key of the user approving the requests.
+                operation_approval_ids: The IDs of the operation approvals to approve, which can be obtained by first listing operation approvals.
+                reviewer_comments: Optional comments from the reviewer, one per operation approval in the same order as operation_approval_ids. Use an empty string for no comment.
+                reviewer_comment: Optional comment from the reviewer for every operation approval without its own comment.
+            """
+            return await self._review_many(
+                self._review_operation_approval, user_id, operation_approval_ids, "approve", reviewer_comments, reviewer_comment)
 
-        self._register_tool("deny_operation_approval", deny_operation_approval)
+        self._register_tool("bulk_approve_operation_approvals",
+                            bulk_approve_operation_approvals)
 
+        async def bulk_deny_operation_approvals(
+            user_id: str,
+            operation_approval_ids: List[str],
+            reviewer_comments: Optional[List[str]] = None,
+            reviewer_comment: Optional[str] = None,
+        ) -> Dict:
+            """
+            Deny several operation approval requests at once. Prefer this tool over denying requests one by one.
+            Returns a report with the outcome of each request.
 
-def main():
-    """Main entry point"""
-    mcp = FastMCP("permit_mcp_server")
-    server = PermitServer(mcp)
+            Args:
+                user_id: The ID or URL-friendly key of the user denying the requests.
+                operation_approval_ids: The IDs of the operation approvals to deny, which can be obtained by first listing operation approvals.
+                reviewer_comments: Optional comments from the reviewer, one per operation approval in the same order as operation_approval_ids. Use an empty string for no comment.
+                reviewer_comment: Optional comment from the reviewer for every operation approval without its own comment.
+            """
+            return await self._review_many(
+                self._review_operation_approval, user_id, operation_approval_ids, "deny", reviewer_comments, reviewer_comment)
 
-    logger.info("Starting Permit MCP server...")
-    server.mcp.run(transport='stdio')
+        self._register_tool("bulk_deny_operation_approvals",
+                            bulk_deny_operation_approvals)
+
+        async def wait_for_pending_requests(
+            user_id: str,
+            kind: Literal["access_requests", "operation_approvals"] = ACCESS_REQUESTS_KIND,
+            cursor: Optional[str] = None,
+            timeout: float = 30,
+            fields: Optional[List[str]] = None,
+        ) -> Dict:
+            """
+            Waits for new pending access requests or operation approvals. Prefer this over listing pending requests repeatedly.
+            Call it without a cursor to get the currently pending requests and a cursor, then call it again with the returned cursor
+            to wait for requests that became pending since. Returns {"items", "cursor", "reset"}; "reset" is true when the cursor
+            was unknown or expired and every pending request was returned instead.
+
+            Args:
+                user_id: The ID or URL-friendly key of the user requesting the list.
+                kind: Which requests to wait for, "access_requests" (default) or "operation_approvals".
+                cursor: Optional cursor returned by the previous call.
+                timeout: Maximum number of seconds to wait for new requests (default: 30, capped by the server). Returns no items on timeout.
+                fields: Optional fields to return for each request, as in list_access_requests and list_operation_approvals.
+            """
+            projection = ACCESS_REQUESTS if kind == ACCESS_REQUESTS_KIND else OPERATION_APPROVALS
+            timeout = min(max(0.0, timeout), self.watch_max_timeout)
+            items, next_cursor, reset = await self._pending_poller(kind, user_id).wait(cursor, timeout)
+            # The items are shared with the other waiters, copy them before attaching users.
+            items = [dict(item) for item in items]
+            fields = projection.resolve(fields)
+            if projection.needs_requesting_user(fields):
+                await self._attach_requesting_users(items)
+            return {"items": projection.apply(items, fields), "cursor": next_cursor, "reset": reset}
+
+        self._register_tool("wait_for_pending_requests",
+                            wait_for_pending_requests)
+
+        if len(self._partitions) > 1:
+            names = tuple(self._partitions)
+
+            async def use_permit_configuration(config: Literal[names]) -> str:
+                """
+                Selects the Permit configuration (tenant and resource) used by the other tools for the rest of this session.
+
+                Args:
+                    config: The name of the configuration.
+                """
+                partition = self._select_partition(config)
+                session = self._current_session()
+                if session is None:
+                    raise ToolError(
+                        "A configuration can only be selected from an MCP session.")
+                self._session_configs[session] = partition.name
+                return f"Using the {partition.name!r} configuration."
+
+            self._register_tool(USE_CONFIGURATION_TOOL,
+                                use_permit_configuration)
+
+        async def get_server_metrics() -> str:
+            """
+            Returns the Permit MCP server metrics (tool call counts and latencies, Permit API status codes and latencies, connection pool and cache usage) in the Prometheus text format.
+            """
+            return self.metrics_text()
+
+        self._register_tool("get_server_metrics", get_server_metrics)
+
+
+TRANSPORTS = ("stdio", "streamable-http", "sse")
+
+
+async def _run_stdio(server: PermitServer, warm_up: bool = False):
+    async with server:
+        if warm_up:
+            server.start_warm_up()
+        await server.mcp.run_stdio_async()
+
+
+async def _run_http(server: PermitServer, transport: str, max_concurrency: Optional[int] = None, warm_up: bool = False):
+    """
+    Serves every MCP session from this process, so they all share the PermitServer
+    connection pool, caches and catalog.
+    """
+    import uvicorn
+
+    mcp = server.mcp
+    app = mcp.streamable_http_app() if transport == "streamable-http" else mcp.sse_app()
+    config = uvicorn.Config(
+        app,
+        host=mcp.settings.host,
+        port=mcp.settings.port,
+        log_level=mcp.settings.log_level.lower(),
+        limit_concurrency=max_concurrency,
+    )
+    async with server:
+        if warm_up:
+            server.start_warm_up()
+        await uvicorn.Server(config).serve()
+
+
+def _parse_args(argv: Optional[List[str]] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Permit MCP server")
+    parser.add_argument("--transport", choices=TRANSPORTS,
+                        default=os.getenv("PERMIT_MCP_TRANSPORT", "stdio"),
+                        help="MCP transport (env: PERMIT_MCP_TRANSPORT, default: stdio).")
+    parser.add_argument("--host", default=os.getenv("PERMIT_MCP_HOST", "127.0.0.1"),
+                        help="Host to bind in HTTP modes (env: PERMIT_MCP_HOST, default: 127.0.0.1).")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PERMIT_MCP_PORT", "8000")),
+                        help="Port to bind in HTTP modes (env: PERMIT_MCP_PORT, default: 8000).")
+    parser.add_argument("--configs", default=os.getenv("PERMIT_MCP_CONFIGS"),
+                        help="Comma-separated names of the configurations to serve, each read from the environment "
+                             "variables prefixed with its upper-cased name, e.g. ACME_TENANT "
+                             "(env: PERMIT_MCP_CONFIGS, default: a single configuration from the unprefixed variables).")
+    parser.add_argument("--max-concurrency", type=int,
+                        default=int(os.getenv("PERMIT_MCP_MAX_CONCURRENCY", "0")) or None,
+                        help="Maximum number of concurrent HTTP connections and requests; "
+                             "more are answered with a 503 (env: PERMIT_MCP_MAX_CONCURRENCY, default: unlimited).")
+    parser.add_argument("--warm-up", action="store_true",
+                        default=os.getenv("PERMIT_MCP_WARM_UP", "").lower() in ("1", "true", "yes"),
+                        help="Import the Permit SDK, open the connection and load the resource instance catalog "
+                             "while the server starts (env: PERMIT_MCP_WARM_UP).")
+    parser.add_argument("--warm-up-users", default=os.getenv("PERMIT_MCP_WARM_UP_USERS"),
+                        help="Comma-separated IDs of frequent users and reviewers to log in while warming up "
+                             "(env: PERMIT_MCP_WARM_UP_USERS).")
+    parser.add_argument("--log-level", default=os.getenv("PERMIT_MCP_LOG_LEVEL", "INFO").upper(),
+                        choices=("DEBUG", "INFO", "WARNING", "ERROR"),
+                        help="Log level (env: PERMIT_MCP_LOG_LEVEL, default: INFO). "
+                             "Tool results are only logged, sampled, at DEBUG.")
+    parser.add_argument("--log-format", choices=LOG_FORMATS, default=os.getenv("PERMIT_MCP_LOG_FORMAT", "text"),
+                        help="Log format, `text` or one JSON object per line (env: PERMIT_MCP_LOG_FORMAT, default: text).")
+    args = parser.parse_args(argv)
+    if args.transport not in TRANSPORTS:
+        parser.error(f"invalid transport {args.transport!r}, expected one of {', '.join(TRANSPORTS)}")
+    if args.log_format not in LOG_FORMATS:
+        parser.error(f"invalid log format {args.log_format!r}, expected one of {', '.join(LOG_FORMATS)}")
+    if args.log_level not in ("DEBUG", "INFO", "WARNING", "ERROR"):
+        parser.error(f"invalid log level {args.log_level!r}")
+    return args
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main entry point"""
+    args = _parse_args(argv)
+    listener = configure_logging(getattr(logging, args.log_level), args.log_format)
+    try:
+        mcp = FastMCP("permit_mcp_server", host=args.host, port=args.port,
+                      log_level=args.log_level)
+        names = [name.strip() for name in (args.configs or "").split(",") if name.strip()]
+        warm_up_users = [user.strip() for user in (args.warm_up_users or "").split(",") if user.strip()]
+        server = PermitServer(mcp, configs=configs_from_env(names) if names else None,
+                              warm_up_users=warm_up_users)
+        warm_up = args.warm_up or bool(warm_up_users)
+
+        if args.transport == "stdio":
+            logger.info("Starting Permit MCP server...")
+            anyio.run(_run_stdio, server, warm_up)
+        else:
+            logger.info(
+                f"Starting Permit MCP server ({args.transport}) on {args.host}:{args.port}...")
+            anyio.run(_run_http, server, args.transport, args.max_concurrency, warm_up)
+    finally:
+        listener.stop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,170 @@
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
+import asyncio
+import random
+import time
+
+# Methods that can be sent again without changing the outcome
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+# Status codes worth retrying: rate limiting and transient upstream failures
+RETRY_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Returns the delay in seconds requested by a `Retry-After` header, given either as
+    seconds or as an HTTP date, or None if the header is missing or invalid.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """
+    Decides whether a failed request is retried and how long to wait before the next attempt.
+
+    Idempotent requests are retried on rate limiting, transient 5xx responses and transport
+    errors. Other requests are only retried when they certainly were not processed, i.e. on
+    a 429 or when the connection could not be established.
+    """
+
+    def __init__(self, max_retries: int = 3, backoff: float = 0.5, backoff_max: float = 10.0):
+        """
+        Args:
+            max_retries: Maximum number of retries after the first attempt.
+            backoff: Base delay in seconds, doubled on every attempt.
+            backoff_max: Maximum delay in seconds. A `Retry-After` longer than this is not waited for.
+        """
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+
+    def should_retry_status(self, method: str, status_code: int) -> bool:
+        if status_code == 429:
+            return True
+        return status_code in RETRY_STATUS_CODES and method in IDEMPOTENT_METHODS
+
+    def should_retry_error(self, method: str, connect_error: bool) -> bool:
+        return connect_error or method in IDEMPOTENT_METHODS
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> Optional[float]:
+        """
+        Returns the delay before retry number `attempt` (starting at 1), or None if the
+        request should not be retried.
+        """
+        if attempt > self.max_retries:
+            return None
+        if retry_after is not None:
+            return retry_after if retry_after <= self.backoff_max else None
+        # Full jitter: spread retries of concurrent callers over the whole backoff window.
+        return random.uniform(0, min(self.backoff_max, self.backoff * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to an endpoint after consecutive failures.
+
+    After `failure_threshold` consecutive failures the circuit opens and requests fail fast
+    for `reset_timeout` seconds. Then a single trial request is let through: the circuit
+    closes if it succeeds and opens again if it fails.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    def retry_in(self) -> float:
+        """
+        Returns the seconds until the circuit lets a request through again.
+        """
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_timeout - self._clock())
+
+    def allow(self) -> bool:
+        """
+        Returns whether a request may be sent now.
+        """
+        if self.state == self.OPEN:
+            if self.retry_in() > 0:
+                return False
+            self.state = self.HALF_OPEN
+            self._trial_in_flight = False
+        if self.state == self.HALF_OPEN:
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+        return True
+
+    def release(self) -> None:
+        """
+        Gives back a trial request that was abandoned before its outcome was known.
+        """
+        self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self._opened_at = self._clock()
+            self._trial_in_flight = False
+
+
+class TokenBucket:
+    """
+    A client-side rate limiter allowing `rate` requests per second on average, with bursts
+    of up to `burst` requests.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None, clock: Callable[[], float] = time.monotonic):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst if burst else max(1, int(rate))
+        self._clock = clock
+        self._tokens = float(self.burst)
+        self._updated_at = clock()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """
+        Waits until a request may be sent. Waiters are served in arrival order.
+        """
+        async with self._lock:
+            while True:
+                now = self._clock()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
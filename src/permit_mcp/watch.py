@@ -0,0 +1,161 @@
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+class PendingPoller:
+    """
+    Polls the pending requests of one user and keeps a numbered log of the requests that
+    became pending, so that any number of waiters share a single upstream poll.
+
+    Cursors have the form "<epoch>.<sequence>", where the epoch identifies the poller.
+    The poller runs while it has waiters, and stops after `idle_timeout` seconds without any.
+    Until a poll succeeds, waiters get the error of the last failed poll.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], Awaitable[List[Dict]]],
+        interval: float = 5.0,
+        idle_timeout: float = 60.0,
+        history: int = 1000,
+        on_idle: Optional[Callable[[], None]] = None,
+    ):
+        """
+        Args:
+            fetch: Coroutine function returning the currently pending requests.
+            interval: Seconds between polls.
+            idle_timeout: Seconds without waiters after which polling stops.
+            history: Number of newly pending requests remembered for cursors.
+            on_idle: Called when polling stops for lack of waiters.
+        """
+        self._fetch = fetch
+        self.interval = interval
+        self.idle_timeout = idle_timeout
+        self.epoch = uuid.uuid4().hex[:8]
+        self.sequence = 0
+        self.polls = 0
+        self._log: Deque[Tuple[int, Dict]] = deque(maxlen=max(1, history))
+        self._pending: Dict[str, Dict] = {}
+        self._changed = asyncio.Condition()
+        self._on_idle = on_idle
+        # Set once a poll completed since the poller started, successfully or not.
+        self._ready = asyncio.Event()
+        self._succeeded = False
+        self.error: Optional[Exception] = None
+        self._wakeup = asyncio.Event()
+        self._waiters = 0
+        self._last_waited = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def cursor(self) -> str:
+        return f"{self.epoch}.{self.sequence}"
+
+    def _parse_cursor(self, cursor: Optional[str]) -> Optional[int]:
+        epoch, _, sequence = (cursor or "").partition(".")
+        if epoch != self.epoch or not sequence.isdigit() or int(sequence) > self.sequence:
+            return None
+        return int(sequence)
+
+    async def wait(self, cursor: Optional[str], timeout: float) -> Tuple[List[Dict], str, bool]:
+        """
+        Waits up to `timeout` seconds for requests that became pending after the cursor.
+
+        Returns the new requests that are still pending, the cursor to wait from next, and
+        whether the cursor was unknown or too old, in which case every pending request is
+        returned. Without a cursor, every pending request is returned right away.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        self._waiters += 1
+        try:
+            self._start()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return [], cursor or self.cursor(), False
+            if not self._succeeded:
+                raise self.error
+
+            since = self._parse_cursor(cursor)
+            oldest = self._log[0][0] if self._log else self.sequence + 1
+            if since is None or since < oldest - 1:
+                return list(self._pending.values()), self.cursor(), cursor is not None
+
+            async with self._changed:
+                try:
+                    await asyncio.wait_for(
+                        self._changed.wait_for(lambda: self.sequence > since),
+                        max(0.0, deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    pass
+            items = [item for sequence, item in self._log
+                     if sequence > since and item.get("id") in self._pending]
+            return items, self.cursor(), False
+        finally:
+            self._waiters -= 1
+            self._last_waited = time.monotonic()
+
+    def _start(self) -> None:
+        if not self.running:
+            # The previous poll may be outdated, wait for a fresh one.
+            self._ready.clear()
+            self._succeeded = False
+            self._task = asyncio.create_task(self._poll_periodically())
+
+    async def _poll_periodically(self) -> None:
+        while True:
+            try:
+                await self._apply(await self._fetch())
+            except Exception as error:
+                logger.warning(f"Failed to poll pending requests: {error}")
+                self.error = error
+                self._ready.set()
+            if self._waiters == 0 and time.monotonic() - self._last_waited > self.idle_timeout:
+                if self._on_idle is not None:
+                    self._on_idle()
+                return
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def wake(self) -> None:
+        """
+        Polls again without waiting for the interval, e.g. after a request was created or reviewed.
+        """
+        if self.running:
+            self._wakeup.set()
+
+    async def _apply(self, items: List[Dict]) -> None:
+        pending = {item.get("id"): item for item in items}
+        async with self._changed:
+            for item_id, item in pending.items():
+                if item_id not in self._pending:
+                    self.sequence += 1
+                    self._log.append((self.sequence, item))
+            self._pending = pending
+            self.polls += 1
+            self._changed.notify_all()
+        self.error = None
+        self._succeeded = True
+        self._ready.set()
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp.exceptions import ToolError
+
+from permit_mcp import PermitServer
+from permit_mcp.fake import FakePermit
+
+
+def _review_many(ids, reviewer_comments=None, reviewer_comment=None):
+    reviewed = []
+
+    async def review(user_id, item_id, decision, comment):
+        reviewed.append((item_id, comment))
+
+    async def run():
+        server = PermitServer(FastMCP("test"), permit=FakePermit())
+        report = await server._review_many(review, "reviewer", ids, "approve", reviewer_comments, reviewer_comment)
+        await server.aclose()
+        return report
+
+    report = asyncio.run(run())
+    return report, sorted(reviewed)
+
+
+def test_comments_stay_aligned_with_repeated_ids():
+    report, reviewed = _review_many(["a", "a", "b"], ["x", "x", "y"])
+    assert reviewed == [("a", "x"), ("b", "y")]
+    assert report["succeeded"] == 2
+
+    _, reviewed = _review_many(["a", "a", "b"], ["", None, "y"], reviewer_comment="z")
+    assert reviewed == [("a", "z"), ("b", "y")]
+
+
+def test_repeated_ids_with_different_comments_are_rejected():
+    with pytest.raises(ToolError, match="more than once"):
+        _review_many(["a", "a", "b"], ["x", "y"])
+    with pytest.raises(ToolError, match="more entries"):
+        _review_many(["a", "a"], ["x", "x", "x"])
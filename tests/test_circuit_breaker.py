@@ -0,0 +1,102 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp.exceptions import ToolError
+from permit.exceptions import PermitConnectionError
+
+from permit_mcp import PermitServer
+from permit_mcp.fake import FakePermit
+
+URL = "https://api.permit.io/v2/facts/project/env/access_requests/element/user/tenant"
+
+
+def _server(statuses, **kwargs) -> PermitServer:
+    """
+    A server whose Permit API answers GET requests with `statuses` in turn, then with 200.
+    """
+    statuses = list(statuses)
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        status = statuses.pop(0) if statuses else 200
+        return httpx.Response(status, json={}, headers={"Retry-After": "0"})
+
+    kwargs.setdefault("retry_backoff", 0)
+    return PermitServer(FastMCP("test"), permit=FakePermit(), transport=httpx.MockTransport(handle), **kwargs)
+
+
+def test_trial_cancelled_while_rate_limited_is_released():
+    async def run():
+        server = _server([503], max_retries=0, circuit_failure_threshold=1, circuit_reset_timeout=0,
+                         rate_limit=20, rate_limit_burst=1, coalesce_reads=False)
+        # The failure opens the circuit, the next request is the half-open trial.
+        assert (await server._send("GET", URL)).status_code == 503
+        # The bucket is empty: the next request waits for a token and is cancelled meanwhile.
+        waiting = asyncio.ensure_future(server._send("GET", URL))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        response = await server._send("GET", URL)
+        assert response.status_code == 200
+        await server.aclose()
+
+    asyncio.run(run())
+
+
+def test_trial_failed_without_response_is_released():
+    async def run():
+        def handle(request: httpx.Request) -> httpx.Response:
+            raise httpx.DecodingError("undecodable", request=request)
+
+        server = _server([503], max_retries=0, circuit_failure_threshold=1, circuit_reset_timeout=0)
+        # The failure opens the circuit, the next request is the half-open trial.
+        assert (await server._send("GET", URL)).status_code == 503
+        transport = server._get_client()._transport
+        healthy = transport.handler
+        transport.handler = handle
+        with pytest.raises(httpx.DecodingError):
+            await server._send("GET", URL)
+        transport.handler = healthy
+        response = await server._send("GET", URL)
+        assert response.status_code == 200
+        await server.aclose()
+
+    asyncio.run(run())
+
+
+def test_rate_limited_responses_do_not_open_the_circuit():
+    async def run():
+        server = _server([429] * 5, max_retries=5, circuit_failure_threshold=1, circuit_reset_timeout=30)
+        response = await server._send("GET", URL)
+        assert response.status_code == 200
+        assert server._circuit_breaker(URL).state == "closed"
+        await server.aclose()
+
+    asyncio.run(run())
+
+
+def test_sdk_calls_are_rate_limited_and_circuit_broken():
+    calls = []
+
+    async def get_by_id(user_id):
+        calls.append(user_id)
+        raise PermitConnectionError("unreachable")
+
+    async def run():
+        permit = SimpleNamespace(api=SimpleNamespace(users=SimpleNamespace(get_by_id=get_by_id)))
+        server = PermitServer(FastMCP("test"), permit=permit, circuit_failure_threshold=1,
+                              circuit_reset_timeout=30, rate_limit=0.001, rate_limit_burst=2)
+        lookup = lambda: server._call_sdk("users", lambda: permit.api.users.get_by_id("joe"))
+        with pytest.raises(PermitConnectionError):
+            await lookup()
+        with pytest.raises(ToolError, match="unavailable"):
+            await lookup()
+        assert calls == ["joe"]
+        # Both calls took a token from the bucket
+        assert server._partition().rate_limiter._tokens < 1
+        await server.aclose()
+
+    asyncio.run(run())
@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+from mcp.server.fastmcp import FastMCP
+
+from permit_mcp import PermitServer
+from permit_mcp.fake import FakePermit
+
+pytest.importorskip("aiosqlite")
+
+
+async def _list(server: PermitServer, user_id: str, **filters):
+    return await server._list_requests("access_requests", user_id, None, None, True, **filters)
+
+
+def test_mirror_and_live_listings_match():
+    async def run():
+        fake = FakePermit(access_requests=300, resource_instances=5)
+        live = PermitServer(FastMCP("live"), permit=FakePermit(), transport=fake.transport)
+        mirrored = PermitServer(FastMCP("mirrored"), permit=FakePermit(), transport=fake.transport,
+                                mirror_path=":memory:")
+        try:
+            user_id = next(iter(fake.users))
+            instance = fake.resource_instances[0]
+
+            # The first listing syncs the mirror, the next ones are served from it while it is fresh.
+            await _list(mirrored, user_id)
+            for _ in range(100):
+                if mirrored.mirror.is_fresh(("default", "access_requests", user_id)):
+                    break
+                await asyncio.sleep(0.01)
+
+            cases = [
+                {},
+                {"status": "pending"},
+                {"role": "child-can-view"},
+                {"resource_instance": instance["key"]},
+                {"resource_instance": instance["id"]},
+                {"status": "approved", "resource_instance": instance["id"]},
+            ]
+            for filters in cases:
+                expected = await _list(live, user_id, **filters)
+                assert await _list(mirrored, user_id, **filters) == expected, filters
+            assert await _list(live, user_id, resource_instance=instance["id"])
+            assert mirrored.mirror.stats["hits"] >= 2
+
+        finally:
+            await live.aclose()
+            await mirrored.aclose()
+
+    asyncio.run(run())
@@ -0,0 +1,92 @@
+import asyncio
+import datetime
+import uuid
+from types import SimpleNamespace
+
+from mcp.server.fastmcp import FastMCP
+from permit.api.models import UserRead
+
+from permit_mcp import PermitServer
+from permit_mcp.projection import ACCESS_REQUESTS, OPERATION_APPROVALS, RESOURCE_INSTANCES
+
+
+def _user(key: str, **fields) -> UserRead:
+    now = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+    return UserRead(key=key, id=uuid.uuid4(), organization_id=uuid.uuid4(), project_id=uuid.uuid4(),
+                    environment_id=uuid.uuid4(), created_at=now, updated_at=now, **fields)
+
+
+def _access_request(user_id: str = "joe") -> dict:
+    return {
+        "id": "ar-1",
+        "status": "pending",
+        "reason": "hungry",
+        "requesting_user_id": user_id,
+        "created_at": "2025-01-01T00:00:00+00:00",
+        "updated_at": "2025-01-01T00:00:00+00:00",
+        "access_request_details": {"tenant": "default", "resource": "restaurants",
+                                   "resource_instance": "pizza", "role": "child-can-view"},
+    }
+
+
+def _attach(items, users):
+    async def get_by_id(user_id):
+        return users[user_id]
+
+    async def run():
+        permit = SimpleNamespace(api=SimpleNamespace(users=SimpleNamespace(get_by_id=get_by_id)))
+        server = PermitServer(FastMCP("test"), permit=permit)
+        await server._attach_requesting_users(items)
+        await server.aclose()
+
+    asyncio.run(run())
+    return items
+
+
+def test_default_fields():
+    item = _access_request()
+    fields = ACCESS_REQUESTS.resolve(None)
+    assert ACCESS_REQUESTS.apply([item], fields) == [{
+        "id": "ar-1",
+        "status": "pending",
+        "role": "child-can-view",
+        "resource_instance": "pizza",
+        "reason": "hungry",
+        "requesting_user_id": "joe",
+        "requester": "joe",
+        "created_at": "2025-01-01T00:00:00+00:00",
+    }]
+    assert "role" not in OPERATION_APPROVALS.apply([item], OPERATION_APPROVALS.resolve([]))[0]
+
+
+def test_all_fields_returns_items_unchanged():
+    item = _access_request()
+    fields = ACCESS_REQUESTS.resolve(["id", "*"])
+    assert fields is None
+    assert ACCESS_REQUESTS.apply([item], fields) == [item]
+    assert ACCESS_REQUESTS.needs_requesting_user(fields)
+
+
+def test_dotted_paths_and_missing_fields():
+    instance = {"id": "1", "key": "pizza", "attributes": {"name": "Pizza", "allowed_for_children": False}}
+    fields = RESOURCE_INSTANCES.resolve(["key", "attributes.name", "attributes.allowed_for_children",
+                                         "attributes.missing", "key.nested"])
+    assert RESOURCE_INSTANCES.apply([instance], fields) == [
+        {"key": "pizza", "attributes.name": "Pizza", "attributes.allowed_for_children": False}]
+
+
+def test_requester_from_sdk_user_model():
+    users = {"joe": _user("joe", email="joe@example.com", first_name="Joe", last_name="Doe"),
+             "ann": _user("ann", email="ann@example.com"),
+             "nobody": _user("nobody")}
+    items = _attach([_access_request("joe"), _access_request("ann"), _access_request("nobody")], users)
+    fields = ACCESS_REQUESTS.resolve(["requester", "requesting_user.email", "requesting_user.id"])
+    assert ACCESS_REQUESTS.needs_requesting_user(fields)
+    projected = ACCESS_REQUESTS.apply(items, fields)
+    assert projected[0] == {"requester": "Joe Doe", "requesting_user.email": "joe@example.com",
+                            "requesting_user.id": str(users["joe"].id)}
+    assert projected[1]["requester"] == "ann@example.com"
+    assert projected[2] == {"requester": "nobody", "requesting_user.id": projected[2]["requesting_user.id"]}
+    # The attached users are plain JSON values, like the rest of the item
+    assert isinstance(items[0]["requesting_user"], dict)
+    assert isinstance(items[0]["requesting_user"]["created_at"], str)
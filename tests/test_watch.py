@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+
+from permit_mcp.watch import PendingPoller
+
+
+def test_waiters_get_the_poll_error_until_a_poll_succeeds():
+    async def run():
+        results = [PermissionError("forbidden"), [{"id": "a"}]]
+
+        async def fetch():
+            result = results.pop(0) if results else [{"id": "a"}]
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        poller = PendingPoller(fetch, interval=0.01)
+        with pytest.raises(PermissionError):
+            await poller.wait(None, timeout=5)
+        await asyncio.sleep(0.05)
+        items, _, _ = await poller.wait(None, timeout=5)
+        assert items == [{"id": "a"}]
+        await poller.stop()
+
+    asyncio.run(run())
+
+
+def test_idle_poller_reports_it_stopped():
+    async def run():
+        stopped = asyncio.Event()
+
+        async def fetch():
+            return []
+
+        poller = PendingPoller(fetch, interval=0.01, idle_timeout=0.02, on_idle=stopped.set)
+        await poller.wait(None, timeout=1)
+        await asyncio.wait_for(stopped.wait(), 1)
+        assert not poller.running
+
+    asyncio.run(run())